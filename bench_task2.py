@@ -0,0 +1,249 @@
+# bench_task2.py
+"""Benchmarks for the code paths the expense splitter (task2.py) runs.
+
+Runs headless against synthetic groups (10 to 100k expenses, 2 to 20
+people, all four split modes, expenses in several currencies) kept in an
+in-memory journal. Cases cover splitting, appending to the journal,
+reloading and updating the BalanceLedger with FX conversion, settling,
+and netting many groups at once. It reports pytest-benchmark style
+timings (min / mean / stddev over adaptive rounds) plus peak memory from
+tracemalloc, and compares them with a baseline saved by an earlier run on
+the same machine (bench_task2_baseline.json, ignored by git):
+
+    python bench_task2.py                 # run and compare with the baseline
+    python bench_task2.py --save          # run and overwrite the baseline
+    python bench_task2.py --quick         # skip the 100k-expense cases
+    python bench_task2.py --settlement    # greedy vs exact transfer counts only
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from task2_engine import BalanceLedger, greedy_transfers, net_groups, optimal_transfers
+from task2_fx import load_rates
+from task2_journal import ExpenseJournal, expense_delta
+from task2_money import EQUALLY, SPLIT_MODES, allocate_splits, from_cents
+
+SEED = 7
+TRIALS = 20
+BASELINE_FILE = Path(__file__).with_name("bench_task2_baseline.json")  # per machine; git-ignored
+REGRESSION = 1.25          # flag cases whose min time grew by more than this factor
+MIN_BENCH_TIME = 0.2       # seconds of repeated calls per case
+MAX_ROUNDS = 50
+EXPENSE_COUNTS = [10, 1_000, 10_000, 100_000]
+PEOPLE_COUNTS = [2, 5, 20]
+GROUP_COUNTS = [10, 100, 1_000]
+CURRENCIES = 3             # expense currencies per synthetic group
+APPENDS = 100              # expenses added per round on top of an existing log
+
+
+# ---------- synthetic data ----------
+def clustered_balances(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Balances that hide zero-sum subgroups, like sub-trips inside one group."""
+    cents = np.zeros(n, dtype=np.int64)
+    people = rng.permutation(n)
+    start = 0
+    while start < n:
+        size = min(int(rng.integers(2, 5)), n - start)
+        members = people[start:start + size]
+        vals = rng.integers(-20_000, 20_000, size)
+        vals[-1] = -vals[:-1].sum()
+        cents[members] = vals
+        start += size
+    return cents
+
+
+def synthetic_ledger(rng: np.random.Generator, n_expenses: int, n_people: int, mode: str, codes):
+    """People list plus expense dicts shaped exactly like task2.py stores them."""
+    people = [f"User {i+1}" for i in range(n_people)]
+    totals = rng.integers(100, 500_000, n_expenses)
+    weights = _mode_weights(rng, n_expenses, n_people, mode, totals)
+    shares = allocate_splits(totals, [mode] * n_expenses, weights)
+    payers = rng.integers(0, n_people, n_expenses)
+    currencies = rng.choice(codes, n_expenses)
+    expenses = [
+        {
+            "desc": "Expense",
+            "amount": from_cents(t),
+            "paid_by": people[p],
+            "split_mode": mode,
+            "shares": dict(zip(people, map(from_cents, row))),
+            "currency": c,
+        }
+        for t, p, row, c in zip(totals.tolist(), payers.tolist(), shares.tolist(), currencies.tolist())
+    ]
+    return people, expenses, weights
+
+
+def filled_journal(people, expenses):
+    """In-memory journal holding ``expenses`` in one group, loaded like the CSV import does."""
+    journal = ExpenseJournal(":memory:")
+    gid = journal.create_group("Bench")
+    journal.set_people(gid, people)
+    delta = {}
+    for e in expenses:
+        for key, cents in expense_delta(e).items():
+            delta[key] = delta.get(key, 0) + cents
+    rows = (
+        (e["desc"], round(e["amount"] * 100), e["paid_by"], e["split_mode"],
+         json.dumps({p: round(v * 100) for p, v in e["shares"].items()}), e["currency"])
+        for e in expenses
+    )
+    journal.append_batch(gid, rows, delta, len(expenses))
+    return journal, gid
+
+
+def synthetic_groups(rng: np.random.Generator, n_groups: int, codes):
+    """all_balances()-shaped columns: zero-sum balances per group and currency, names shared across groups."""
+    group_ids, names, currencies, cents = [], [], [], []
+    pool = [f"User {i+1}" for i in range(max(20, n_groups // 2))]
+    for g in range(n_groups):
+        members = rng.choice(pool, int(rng.integers(2, 21)), replace=False).tolist()
+        for code in rng.choice(codes, int(rng.integers(1, CURRENCIES + 1)), replace=False).tolist():
+            vals = rng.integers(-50_000, 50_000, len(members))
+            vals[-1] = -vals[:-1].sum()
+            group_ids += [g] * len(members)
+            names += members
+            currencies += [code] * len(members)
+            cents.append(vals)
+    return np.array(group_ids, dtype=np.int64), names, currencies, np.concatenate(cents)
+
+
+def _mode_weights(rng, n_expenses, n_people, mode, totals) -> np.ndarray:
+    if mode == EQUALLY:
+        return np.zeros((n_expenses, n_people))
+    raw = rng.random((n_expenses, n_people)) * (rng.random((n_expenses, n_people)) < 0.7)
+    if mode == SPLIT_MODES[1]:    # percent, one decimal
+        return np.round(raw / np.maximum(raw.sum(axis=1, keepdims=True), 1e-9) * 100, 1)
+    if mode == SPLIT_MODES[2]:    # whole shares
+        return np.rint(raw * 4)
+    return np.round(raw / np.maximum(raw.sum(axis=1, keepdims=True), 1e-9) * totals[:, None] / 100, 2)
+
+
+# ---------- measuring ----------
+def measure(fn) -> dict:
+    """Adaptive rounds like pytest-benchmark, then one traced call for peak memory."""
+    times = []
+    start = time.perf_counter()
+    while len(times) < MAX_ROUNDS and (not times or time.perf_counter() - start < MIN_BENCH_TIME):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "rounds": len(times),
+        "min_s": min(times),
+        "mean_s": statistics.fmean(times),
+        "stddev_s": statistics.pstdev(times),
+        "peak_kb": peak / 1024,
+    }
+
+
+def suite_cases(quick: bool):
+    """(name, callable) pairs; ledgers and journals are built once per size and mode."""
+    rng = np.random.default_rng(SEED)
+    fx = load_rates()
+    codes = fx.codes[:CURRENCIES]
+    to = codes[0]
+    for n_exp in EXPENSE_COUNTS:
+        if quick and n_exp > 10_000:
+            continue
+        for n_people in PEOPLE_COUNTS:
+            for mode in SPLIT_MODES:
+                people, expenses, weights = synthetic_ledger(rng, n_exp, n_people, mode, codes)
+                tag = f"{n_exp}x{n_people}:{mode}"
+                totals = np.array([round(e["amount"] * 100) for e in expenses])
+                journal, gid = filled_journal(people, expenses)
+                extra = expenses[:APPENDS]
+
+                yield f"allocate_splits[{tag}]", (
+                    lambda totals=totals, mode=mode, weights=weights:
+                    allocate_splits(totals, [mode] * len(totals), weights)
+                )
+                # Add Expense: one journal row plus one ledger delta, then the converted totals
+                yield f"journal.append[{tag}]", (
+                    lambda journal=journal, gid=gid, extra=extra: [journal.append(gid, e) for e in extra]
+                )
+                yield f"ledger.load[{tag}]", (
+                    lambda journal=journal, gid=gid, people=people:
+                    BalanceLedger.from_native(people, journal.balances_by_currency(gid, people), fx.factors(to))
+                )
+                ledger = BalanceLedger.from_native(people, journal.balances_by_currency(gid, people), fx.factors(to))
+                yield f"ledger.append+totals[{tag}]", (
+                    lambda ledger=ledger, extra=extra: [(ledger.append(e), ledger.totals) for e in extra]
+                )
+                yield f"ledger.transfers[{tag}]", lambda ledger=ledger: optimal_transfers(ledger.people, ledger.totals)
+
+    for n_groups in GROUP_COUNTS:
+        group_ids, names, currencies, cents = synthetic_groups(rng, n_groups, codes)
+        yield f"net_groups[{n_groups} groups]", (
+            lambda group_ids=group_ids, names=names, currencies=currencies, cents=cents:
+            net_groups(group_ids, names, fx.convert_cents(cents, currencies, to))
+        )
+
+
+def run_suite(quick: bool, save: bool):
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    results, regressions = {}, []
+    print(f"{'case':<48} {'rounds':>6} {'min ms':>10} {'mean ms':>10} {'stddev':>9} {'peak KB':>10}  vs base")
+    for name, fn in suite_cases(quick):
+        r = measure(fn)
+        results[name] = r
+        base = baseline.get(name)
+        ratio = r["min_s"] / base["min_s"] if base and base["min_s"] > 0 else None
+        flag = "" if ratio is None else f"{ratio:5.2f}x" + ("  REGRESSION" if ratio > REGRESSION else "")
+        if ratio is not None and ratio > REGRESSION:
+            regressions.append(name)
+        print(
+            f"{name:<48} {r['rounds']:>6} {r['min_s'] * 1e3:>10.3f} {r['mean_s'] * 1e3:>10.3f} "
+            f"{r['stddev_s'] * 1e3:>9.3f} {r['peak_kb']:>10.1f}  {flag}"
+        )
+    if save:
+        BASELINE_FILE.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"Baseline saved to {BASELINE_FILE.name} ({len(results)} cases).")
+    elif regressions:
+        print(f"{len(regressions)} case(s) slower than {REGRESSION}x baseline: " + ", ".join(regressions))
+    return regressions
+
+
+# ---------- settlement: greedy vs exact ----------
+def bench_settlement():
+    rng = np.random.default_rng(SEED)
+    print("Settlement: greedy vs exact (mean over %d ledgers)" % TRIALS)
+    print(f"{'people':>6} {'greedy tx':>10} {'exact tx':>9} {'greedy ms':>10} {'exact ms':>9}")
+    for n in range(5, 21):
+        people = [f"User {i+1}" for i in range(n)]
+        g_tx = e_tx = g_t = e_t = 0.0
+        for _ in range(TRIALS):
+            cents = clustered_balances(rng, n)
+            t0 = time.perf_counter()
+            g_tx += len(greedy_transfers(people, cents))
+            t1 = time.perf_counter()
+            e_tx += len(optimal_transfers(people, cents))
+            t2 = time.perf_counter()
+            g_t += t1 - t0
+            e_t += t2 - t1
+        print(
+            f"{n:>6} {g_tx / TRIALS:>10.2f} {e_tx / TRIALS:>9.2f} "
+            f"{g_t / TRIALS * 1e3:>10.3f} {e_t / TRIALS * 1e3:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", action="store_true", help="overwrite the baseline JSON with this run")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-expense ledgers")
+    parser.add_argument("--settlement", action="store_true", help="only compare greedy vs exact settlement")
+    args = parser.parse_args()
+    if args.settlement:
+        bench_settlement()
+    else:
+        raise SystemExit(1 if run_suite(args.quick, args.save) else 0)
@@ -0,0 +1,32 @@
+# import_report.py
+"""Row-rejection report shared by the streaming CSV imports (task2_import.py,
+task6_import.py).
+
+Each chunk's rejected rows are passed in with their file line numbers and a
+reason. All of them are counted, but only the first ``MAX_ERROR_ROWS`` are
+kept, with their raw cells, for the downloadable error report.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+MAX_ERROR_ROWS = 1_000  # rejected rows kept for the report; the rest are only counted
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.errors: List[Dict] = []
+
+    def reject(self, lines: np.ndarray, reasons: np.ndarray, raw: pd.DataFrame):
+        self.rejected += len(lines)
+        room = MAX_ERROR_ROWS - len(self.errors)
+        if room > 0:
+            kept = raw.iloc[:room].astype(str)
+            for line, reason, values in zip(lines[:room].tolist(), reasons[:room].tolist(), kept.to_dict("records")):
+                self.errors.append({"line": line, "reason": reason, **values})
+
+    def errors_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.errors)
@@ -1,91 +1,178 @@
 # app.py
-from typing import Dict, List
+import math
+from typing import Dict, List, Tuple
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from task2_engine import BalanceLedger, NettedDebts, net_groups
+from task2_fx import FxRates, load_rates, rates_version
+from task2_import import import_expenses
+from task2_journal import ExpenseJournal
+from task2_money import BY_PERCENT, BY_SHARES, EQUALLY, SPLIT_MODES, allocate_splits, from_cents, money, to_cents
+
 st.set_page_config(page_title="Expense Splitter", layout="wide")
 EPS = 0.01  # rounding tolerance
+SETTLE_TIME_BUDGET = 1.0  # seconds for the exact settlement solver
+DEFAULT_GROUP = "My Group"
+LOG_PAGE_SIZE = 50
+LOG_SORTS = {"Added": "id", "Amount": "amount", "Description": "desc", "Paid by": "paid_by"}
 
 
 # ---------- helpers ----------
-def money(x: float) -> float:
-    return float(f"{x:.2f}")
+@st.cache_resource
+def get_journal() -> ExpenseJournal:
+    return ExpenseJournal()
+
+
+@st.cache_resource(max_entries=2)
+def get_rates(version) -> FxRates:
+    """Cross-rate matrix, built once per version of the local rates file."""
+    return load_rates()
+
+
+def current_rates() -> FxRates:
+    return get_rates(rates_version())
+
+
+def load_group(group_id: int):
+    info = get_journal().group(group_id)
+    st.session_state.group_id = group_id
+    st.session_state.people = info["people"]      # type: List[str]
+    st.session_state.currency = info["currency"]
 
 
 def init_state():
-    if "people" not in st.session_state:
-        st.session_state.people = []            # type: List[str]
-    if "expenses" not in st.session_state:
-        st.session_state.expenses = []          # type: List[Dict]
-    if "currency" not in st.session_state:
-        st.session_state.currency = "AED"
-
-
-def compute_balances(people: List[str], expenses: List[Dict]) -> Dict[str, float]:
-    """Net balance per person (positive => others owe them)."""
-    balances = {p: 0.0 for p in people}
-    for e in expenses:
-        amount = float(e["amount"])
-        paid_by = e["paid_by"]
-        shares = e["shares"]  # dict: person -> owed amount
-        balances[paid_by] += amount
-        for p, owed in shares.items():
-            balances[p] -= float(owed)
-    return {p: money(v) for p, v in balances.items()}
-
-
-def settle(balances: Dict[str, float]) -> List[Dict]:
-    """Greedy debtor→creditor settlement."""
-    debtors = [[p, -amt] for p, amt in balances.items() if amt < -EPS]
-    creditors = [[p, amt] for p, amt in balances.items() if amt > EPS]
-    debtors.sort(key=lambda x: x[1], reverse=True)
-    creditors.sort(key=lambda x: x[1], reverse=True)
-
-    transfers, i, j = [], 0, 0
-    while i < len(debtors) and j < len(creditors):
-        d_name, d_amt = debtors[i]
-        c_name, c_amt = creditors[j]
-        pay = money(min(d_amt, c_amt))
-        if pay > EPS:
-            transfers.append({"from": d_name, "to": c_name, "amount": money(pay)})
-            d_amt = money(d_amt - pay)
-            c_amt = money(c_amt - pay)
-            debtors[i][1] = d_amt
-            creditors[j][1] = c_amt
-        if d_amt <= EPS:
-            i += 1
-        if c_amt <= EPS:
-            j += 1
-    return transfers
-
-
-def validate_shares(total: float, shares: Dict[str, float]) -> Dict[str, float]:
-    """Scale/round shares to match total; last person absorbs rounding."""
-    names = list(shares.keys())
-    vals = [max(0.0, float(shares[n])) for n in names]
-    s = sum(vals)
-    if s == 0:
-        each = total / len(vals) if vals else 0
-        vals = [each] * len(vals)
-        s = sum(vals)
-    scale = total / s if s else 1.0
-    vals = [money(v * scale) for v in vals]
-    diff = money(total - sum(vals))
-    if names:
-        vals[-1] = money(vals[-1] + diff)
-    return {n: v for n, v in zip(names, vals)}
+    if "group_id" not in st.session_state:
+        journal = get_journal()
+        groups = journal.groups()
+        load_group(groups[0][0] if groups else journal.create_group(DEFAULT_GROUP))
+
+
+def ledger_key():
+    gid = st.session_state.group_id
+    return (gid, tuple(st.session_state.people), get_journal().revision(gid),
+            st.session_state.currency, current_rates().version)
+
+
+def get_ledger() -> BalanceLedger:
+    """Session balance ledger; reloaded from the journal's balances table when the
+    group, people, journal revision (e.g. another tab), reporting currency or
+    rates file changed."""
+    key = ledger_key()
+    if st.session_state.get("ledger_key") != key:
+        gid, people, _, currency, _ = key
+        info = get_journal().group(gid)
+        st.session_state.ledger = BalanceLedger.from_native(
+            people, get_journal().balances_by_currency(gid, people),
+            current_rates().factors(currency), info["n_expenses"],
+        )
+        st.session_state.ledger_key = key
+    return st.session_state.ledger
+
+
+def mark_written(rev: int):
+    """Record a write this session already applied to its ledger. If the journal
+    moved by more than that one write (another tab got in between), the key is
+    left stale so the next get_ledger() reloads."""
+    key = st.session_state.ledger_key
+    if rev == key[2] + 1:
+        st.session_state.ledger_key = key[:2] + (rev,) + key[3:]
+
+
+@st.cache_data(max_entries=8)
+def netted_debts(total_rev: int, currency: str, rates_ver) -> Tuple[NettedDebts, List[str]]:
+    """Cross-group netting in ``currency``, recomputed only when some group's
+    expenses or the rates file changed. Also returns the currencies left out
+    because rates.json has no rate for them."""
+    fx = get_rates(rates_ver)
+    group_ids, names, currencies, cents = get_journal().all_balances()
+    names, currencies = np.asarray(names, dtype=object), np.asarray(currencies, dtype=object)
+    known = np.isin(currencies, fx.codes)
+    cents = fx.convert_cents(cents[known], currencies[known], currency)
+    net = net_groups(group_ids[known], names[known].tolist(), cents, SETTLE_TIME_BUDGET)
+    return net, sorted(set(currencies[~known].tolist()))
+
+
+def unconverted_warning(codes: List[str]):
+    if codes:
+        st.warning(f"Expenses in {', '.join(codes)} are left out: rates.json has no rate for them.")
+
+
+def log_rows(expenses: List[Dict]) -> List[Dict]:
+    return [
+        {
+            "Description": e["desc"],
+            "Amount": e["amount"],
+            "Currency": e["currency"],
+            "Paid by": e["paid_by"],
+            "Split": e["split_mode"],
+            "Per-person": ", ".join([f"{k}: {money(v)}" for k, v in e["shares"].items()]),
+        }
+        for e in expenses
+    ]
+
+
+@st.cache_data(max_entries=64)
+def log_page(group_id: int, rev: int, page: int, sort: str, descending: bool,
+             payer: str, search: str) -> pd.DataFrame:
+    """One rendered page of the Expense Log; ``rev`` keys the cache to the journal version."""
+    expenses = get_journal().page(
+        group_id, (page - 1) * LOG_PAGE_SIZE, LOG_PAGE_SIZE, sort, descending, payer or None, search or None
+    )
+    return pd.DataFrame(log_rows(expenses))
+
+
+@st.cache_data(max_entries=64)
+def log_count(group_id: int, rev: int, payer: str, search: str) -> int:
+    return get_journal().count(group_id, payer or None, search or None)
+
+
+@st.cache_data(max_entries=4)
+def expenses_csv(group_id: int, rev: int) -> bytes:
+    """Full log as CSV, streamed from the journal in chunks; built once per journal version."""
+    journal, chunk, parts = get_journal(), [], []
+    for e in journal.iter_expenses(group_id):
+        chunk.append(e)
+        if len(chunk) == 5000:
+            parts.append(pd.DataFrame(log_rows(chunk)).to_csv(index=False, header=not parts))
+            chunk = []
+    if chunk or not parts:
+        parts.append(pd.DataFrame(log_rows(chunk)).to_csv(index=False, header=not parts))
+    return "".join(parts).encode("utf-8")
 
 
 # ---------- UI ----------
 init_state()
+journal = get_journal()
+fx = current_rates()
 st.title("💸 Expense Splitter (Tricount-style)")
 st.caption("Add people → add expenses → see who owes whom. Fair & simple.")
 
 with st.sidebar:
     st.header("⚙️ Setup")
-    st.session_state.currency = st.selectbox(
-        "Currency", ["AED", "USD", "EUR", "INR", "SAR", "GBP"], index=0
+    groups = dict(journal.groups())
+    group_ids = list(groups)
+    picked = st.selectbox(
+        "Group", group_ids, index=group_ids.index(st.session_state.group_id), format_func=groups.get
+    )
+    if picked != st.session_state.group_id:
+        load_group(picked)
+    with st.form("group_form", clear_on_submit=True):
+        new_group = st.text_input("New group name")
+        if st.form_submit_button("Create Group") and new_group.strip():
+            load_group(journal.create_group(new_group.strip(), st.session_state.currency))
+            st.rerun()
+
+    currency = st.selectbox(
+        "Reporting currency", fx.codes,
+        index=fx.codes.index(st.session_state.currency) if st.session_state.currency in fx.codes else 0,
+        key=f"currency_{st.session_state.group_id}",
+        help="Balances and settlements are converted into this currency; each expense keeps its own.",
     )
+    if currency != st.session_state.currency:
+        journal.set_currency(st.session_state.group_id, currency)
+        st.session_state.currency = currency
 
     st.subheader("👥 People")
     with st.form("people_form", clear_on_submit=False):
@@ -112,6 +199,7 @@ with st.sidebar:
                     unique.append(n)
                     seen.add(key)
             st.session_state.people = unique
+            journal.set_people(st.session_state.group_id, unique)
             st.success(f"Saved {len(unique)} participant(s).")
 
 if not st.session_state.people:
@@ -121,117 +209,148 @@ if not st.session_state.people:
 # ---------- Add expense ----------
 st.header("➕ Add an Expense")
 with st.form("expense_form", clear_on_submit=True):
-    c1, c2, c3 = st.columns([2, 1, 1])
+    c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
     desc = c1.text_input("Description", value="Expense")
-    amount = c2.number_input(
-        f"Amount ({st.session_state.currency})",
-        min_value=0.0, value=0.0, step=0.01, format="%.2f"
-    )
-    paid_by = c3.selectbox("Paid by", st.session_state.people)
+    amount = c2.number_input("Amount", min_value=0.0, value=0.0, step=0.01, format="%.2f")
+    expense_currency = c3.selectbox("Currency", fx.codes, index=fx.codes.index(currency))
+    paid_by = c4.selectbox("Paid by", st.session_state.people)
 
     split_mode = st.radio(
         "How to split?",
-        ["Equally", "By Percent (%)", "By Shares", "By Exact Amount"],
+        SPLIT_MODES,
         horizontal=True,
     )
 
     per_user_inputs = {}
-    if split_mode == "Equally":
+    if split_mode == EQUALLY:
         st.caption("Each person will owe an equal share.")
     else:
         st.caption("Enter the split for each person:")
         cols = st.columns(3)
         for idx, p in enumerate(st.session_state.people):
-            if split_mode == "By Percent (%)":
+            if split_mode == BY_PERCENT:
                 per_user_inputs[p] = cols[idx % 3].number_input(
                     f"{p} (%)", min_value=0.0, value=0.0, step=0.1, format="%.1f", key=f"pct_{p}"
                 )
-            elif split_mode == "By Shares":
+            elif split_mode == BY_SHARES:
                 per_user_inputs[p] = cols[idx % 3].number_input(
                     f"{p} (shares)", min_value=0.0, value=0.0, step=1.0, format="%.0f", key=f"share_{p}"
                 )
             else:  # By Exact Amount
                 per_user_inputs[p] = cols[idx % 3].number_input(
-                    f"{p} ({st.session_state.currency})", min_value=0.0, value=0.0, step=0.01, format="%.2f", key=f"amt_{p}"
+                    f"{p} (amount)", min_value=0.0, value=0.0, step=0.01, format="%.2f", key=f"amt_{p}"
                 )
 
     if st.form_submit_button("Add Expense"):
         if amount <= 0:
             st.error("Amount must be greater than zero.")
+        elif expense_currency not in current_rates().codes:
+            st.error(f"No rate for {expense_currency} in rates.json.")
         else:
-            if split_mode == "Equally":
-                each = amount / len(st.session_state.people)
-                shares_amounts = {p: money(each) for p in st.session_state.people}
-                diff = money(amount - sum(shares_amounts.values()))
-                last = st.session_state.people[-1]
-                shares_amounts[last] = money(shares_amounts[last] + diff)
-            elif split_mode == "By Percent (%)":
-                raw = {p: float(per_user_inputs.get(p, 0.0)) for p in st.session_state.people}
-                if sum(raw.values()) <= 0:
-                    raw = {p: 100 / len(raw) for p in raw}
-                total_pct = sum(raw.values())
-                amt_map = {p: money(amount * (raw[p] / total_pct)) for p in raw}
-                shares_amounts = validate_shares(amount, amt_map)
-            elif split_mode == "By Shares":
-                raw = {p: float(per_user_inputs.get(p, 0.0)) for p in st.session_state.people}
-                if sum(raw.values()) <= 0:
-                    raw = {p: 1.0 for p in raw}
-                total_shares = sum(raw.values())
-                amt_map = {p: money(amount * (raw[p] / total_shares)) for p in raw}
-                shares_amounts = validate_shares(amount, amt_map)
-            else:  # By Exact Amount
-                raw = {p: float(per_user_inputs.get(p, 0.0)) for p in st.session_state.people}
-                shares_amounts = validate_shares(amount, raw)
+            people = st.session_state.people
+            weights = [float(per_user_inputs.get(p, 0.0)) for p in people]
+            cents = allocate_splits([to_cents(amount)], [split_mode], [weights])[0]
+            shares_amounts = {p: from_cents(c) for p, c in zip(people, cents.tolist())}
 
             if any(v < -EPS for v in shares_amounts.values()):
                 st.error("Invalid split amounts.")
             elif money(sum(shares_amounts.values())) != money(amount):
                 st.error("Split does not sum to total. Please check inputs.")
             else:
-                st.session_state.expenses.append(
-                    {
-                        "desc": desc.strip() or "Expense",
-                        "amount": money(amount),
-                        "paid_by": paid_by,
-                        "split_mode": split_mode,
-                        "shares": shares_amounts,
-                    }
-                )
+                expense = {
+                    "desc": desc.strip() or "Expense",
+                    "amount": money(amount),
+                    "paid_by": paid_by,
+                    "split_mode": split_mode,
+                    "shares": shares_amounts,
+                    "currency": expense_currency,
+                }
+                get_ledger().append(expense)
+                mark_written(journal.append(st.session_state.group_id, expense))
                 st.success("Expense added!")
 
+# ---------- bulk import ----------
+with st.expander("📥 Import expenses from CSV"):
+    up = st.file_uploader("Bank statement / export (CSV)", type=["csv"], key="import_csv")
+    if up is not None:
+        header = list(pd.read_csv(up, nrows=0).columns)
+        up.seek(0)
+        c1, c2, c3 = st.columns(3)
+        desc_col = c1.selectbox("Description column", header, index=0)
+        amount_col = c2.selectbox("Amount column", header, index=min(1, len(header) - 1))
+        paid_col = c3.selectbox("Paid-by column", header, index=min(2, len(header) - 1))
+        import_currency = st.selectbox("Currency of this file", fx.codes, index=fx.codes.index(currency))
+        import_mode = st.radio(
+            "Split each row", SPLIT_MODES, horizontal=True, key="import_split",
+            help="For modes other than Equally, columns named after participants hold each row's split.",
+        )
+        if st.button("Import", type="primary"):
+            if import_currency not in current_rates().codes:
+                st.error(f"No rate for {import_currency} in rates.json.")
+            else:
+                bar = st.progress(0.0, text="Importing…")
+                report = import_expenses(
+                    journal, st.session_state.group_id, up, st.session_state.people,
+                    desc_col, amount_col, paid_col, import_currency, import_mode,
+                    on_progress=lambda n: bar.progress(min(up.tell() / max(up.size, 1), 1.0), text=f"Read {n:,} rows…"),
+                )
+                bar.empty()
+                st.success(f"Imported {report.imported:,} expense(s); rejected {report.rejected:,} row(s).")
+                if report.rejected:
+                    errors = report.errors_frame()
+                    st.dataframe(errors, use_container_width=True)
+                    st.download_button(
+                        "⬇️ Download Error Report (CSV)",
+                        data=errors.to_csv(index=False).encode("utf-8"),
+                        file_name="import_errors.csv",
+                        mime="text/csv",
+                    )
+
 # ---------- expense table ----------
 st.subheader("📒 Expense Log")
-if not st.session_state.expenses:
+n_expenses = get_ledger().count
+if not n_expenses:
     st.info("No expenses yet. Add your first one above.")
 else:
-    rows = []
-    for e in st.session_state.expenses:
-        rows.append(
-            {
-                "Description": e["desc"],
-                f"Amount ({st.session_state.currency})": e["amount"],
-                "Paid by": e["paid_by"],
-                "Split": e["split_mode"],
-                "Per-person": ", ".join([f"{k}: {money(v)}" for k, v in e["shares"].items()]),
-            }
-        )
-    df = pd.DataFrame(rows)
-    st.dataframe(df, use_container_width=True)
+    gid, rev = st.session_state.group_id, st.session_state.ledger_key[2]
+    f1, f2, f3, f4 = st.columns([2, 1, 1, 1])
+    search = f1.text_input("Search description", key="log_search").strip()
+    payer = f2.selectbox("Paid by", ["All"] + st.session_state.people, key="log_payer")
+    payer = "" if payer == "All" else payer
+    sort_label = f3.selectbox("Sort by", list(LOG_SORTS), key="log_sort")
+    descending = f4.toggle("Descending", key="log_desc")
+
+    n_matching = log_count(gid, rev, payer, search)
+    n_pages = max(math.ceil(n_matching / LOG_PAGE_SIZE), 1)
+    page = int(st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)) if n_pages > 1 else 1
+    df = log_page(gid, rev, page, LOG_SORTS[sort_label], descending, payer, search)
+    if df.empty:
+        st.info("No expenses match these filters.")
+    else:
+        start = (page - 1) * LOG_PAGE_SIZE
+        st.dataframe(df, use_container_width=True)
+        st.caption(f"Showing {start + 1}–{start + len(df)} of {n_matching} matching expenses ({n_expenses} total)")
 
     c1, c2 = st.columns(2)
     with c1:
         if st.button("🗑️ Clear All Expenses", type="secondary"):
-            st.session_state.expenses = []
+            get_ledger().clear()
+            mark_written(journal.clear(st.session_state.group_id))
             st.rerun()
     with c2:
-        if st.button("↩️ Undo Last Expense", type="secondary", disabled=(len(st.session_state.expenses) == 0)):
-            st.session_state.expenses.pop()
+        if st.button("↩️ Undo Last Expense", type="secondary", disabled=(n_expenses == 0)):
+            ledger = get_ledger()
+            last, rev = journal.pop_last(st.session_state.group_id)
+            if last is not None:
+                ledger.remove(last)
+                mark_written(rev)
             st.rerun()
 
 # ---------- balances & settlement ----------
-if st.session_state.expenses:
+if n_expenses:
     st.header("🧮 Balances & Settlement")
-    balances = compute_balances(st.session_state.people, st.session_state.expenses)
+    ledger = get_ledger()
+    balances = ledger.balances()
 
     bal_df = (
         pd.DataFrame(
@@ -241,9 +360,11 @@ if st.session_state.expenses:
         .reset_index(drop=True)
     )
     st.subheader("Net Balances")
+    st.caption(f"In {st.session_state.currency}, using the rates in rates.json" + (f" (as of {fx.as_of})." if fx.as_of else "."))
+    unconverted_warning(ledger.unconverted)
     st.dataframe(bal_df, use_container_width=True)
 
-    transfers = settle(balances)
+    transfers = ledger.transfers(SETTLE_TIME_BUDGET)
     st.subheader("Who pays whom")
     if not transfers:
         st.success("🎉 All settled! Nobody owes anything.")
@@ -255,12 +376,17 @@ if st.session_state.expenses:
 
         c1, c2 = st.columns(2)
         with c1:
-            st.download_button(
-                "⬇️ Download Expenses (CSV)",
-                data=pd.DataFrame(rows).to_csv(index=False).encode("utf-8"),
-                file_name="expenses.csv",
-                mime="text/csv",
-            )
+            # building the CSV reads the whole log, so only do it on request (once per journal version)
+            csv_key = (st.session_state.group_id, st.session_state.ledger_key[2])
+            if st.session_state.get("csv_ready") != csv_key and st.button("📄 Prepare Expenses CSV"):
+                st.session_state.csv_ready = csv_key
+            if st.session_state.get("csv_ready") == csv_key:
+                st.download_button(
+                    "⬇️ Download Expenses (CSV)",
+                    data=expenses_csv(*csv_key),
+                    file_name="expenses.csv",
+                    mime="text/csv",
+                )
         with c2:
             st.download_button(
                 "⬇️ Download Settlements (CSV)",
@@ -269,6 +395,20 @@ if st.session_state.expenses:
                 mime="text/csv",
             )
 
+# ---------- cross-group netting ----------
+if st.checkbox(f"🌐 Net debts across all groups (in {st.session_state.currency})"):
+    net, unconverted = netted_debts(journal.total_revision(), st.session_state.currency, fx.version)
+    unconverted_warning(unconverted)
+    if not net.transfers:
+        st.success("🎉 Nobody owes anything across groups.")
+    else:
+        m1, m2 = st.columns(2)
+        m1.metric("Transfers if each group settles", net.group_transfers)
+        m2.metric("Transfers after netting", len(net.transfers))
+        ndf = pd.DataFrame(net.transfers)
+        ndf.rename(columns={"from": "From", "to": "To", "amount": f"Amount ({st.session_state.currency})"}, inplace=True)
+        st.dataframe(ndf, use_container_width=True)
+
 st.markdown("---")
 st.caption(
     "Tip: Use **By Shares** for rent by room size; **By Percent** when someone covers a percentage; "
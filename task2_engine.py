@@ -0,0 +1,290 @@
+# task2_engine.py
+"""Headless settlement engine for the expense splitter (task2.py).
+
+Balances are int64 cent vectors, one slot per person: ``BalanceLedger``
+keeps them per currency and updates them per expense, the transfer solvers
+settle a vector, and ``net_groups`` nets many groups' vectors at once.
+Nothing in here imports Streamlit, so it can be driven from scripts too.
+"""
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from task2_money import from_cents, to_cents
+
+EPS_CENTS = 1  # same tolerance as task2.EPS (0.01), in cents
+MAX_EXACT_PEOPLE = 20        # 2**20 subset table ≈ 10 MB
+DEFAULT_TIME_BUDGET = 1.0    # seconds before falling back to greedy
+
+
+# ---------- settlement ----------
+def greedy_transfers(people: Sequence[str], cents: np.ndarray) -> List[Dict]:
+    """Greedy debtor→creditor settlement over integer-cent balances."""
+    src, dst, paid = greedy_pairs(cents)
+    return [
+        {"from": people[i], "to": people[j], "amount": from_cents(c)} for i, j, c in zip(src, dst, paid)
+    ]
+
+
+def greedy_pairs(cents: np.ndarray):
+    """Greedy settlement as parallel (debtor index, creditor index, cents) lists."""
+    cents = np.asarray(cents, dtype=np.int64)
+    debt_idx = np.flatnonzero(cents < -EPS_CENTS)
+    cred_idx = np.flatnonzero(cents > EPS_CENTS)
+    # largest first; stable so ties keep the people order
+    debt_idx = debt_idx[np.argsort(cents[debt_idx], kind="stable")].tolist()
+    cred_idx = cred_idx[np.argsort(-cents[cred_idx], kind="stable")].tolist()
+    debts = [-cents[k] for k in debt_idx]
+    creds = [cents[k] for k in cred_idx]
+
+    src, dst, paid = [], [], []
+    i = j = 0
+    while i < len(debts) and j < len(creds):
+        pay = min(debts[i], creds[j])
+        if pay > EPS_CENTS:
+            src.append(debt_idx[i])
+            dst.append(cred_idx[j])
+            paid.append(int(pay))
+            debts[i] -= pay
+            creds[j] -= pay
+        if debts[i] <= EPS_CENTS:
+            i += 1
+        if creds[j] <= EPS_CENTS:
+            j += 1
+    return src, dst, paid
+
+
+def optimal_transfers(
+    people: Sequence[str], cents: np.ndarray, time_budget: float = DEFAULT_TIME_BUDGET
+) -> List[Dict]:
+    """Minimum-transfer settlement; greedy fallback if the exact solve runs out of time.
+
+    Each zero-sum group of k people needs k-1 transfers, so the fewest transfers
+    come from splitting balances into as many zero-sum groups as possible and
+    settling each group greedily on its own.
+    """
+    cents = np.asarray(cents, dtype=np.int64)
+    groups = zero_sum_groups(cents, time_budget)
+    if groups is None:
+        return greedy_transfers(people, cents)
+    transfers = []
+    for g in groups:
+        transfers += greedy_transfers([people[i] for i in g], cents[g])
+    return transfers
+
+
+def zero_sum_groups(cents: np.ndarray, time_budget: float = DEFAULT_TIME_BUDGET) -> Optional[List[List[int]]]:
+    """Partition non-zero balances into the maximum number of zero-sum groups.
+
+    Bitmask DP: ``dp[mask]`` is the most zero-sum groups a chain of single-person
+    removals from ``mask`` can pass through. Masks are filled layer by layer
+    (by popcount) so each layer is a handful of NumPy gathers. Returns index
+    lists into ``cents``, or None when there are too many people or the time
+    budget runs out.
+    """
+    deadline = time.perf_counter() + time_budget
+    cents = np.asarray(cents, dtype=np.int64)
+    groups, rest = _pair_opposites(cents)
+    n = len(rest)
+    if n == 0:
+        return groups
+    if n > MAX_EXACT_PEOPLE:
+        return None
+
+    # subset sums and popcounts for every mask, built by doubling
+    sums = np.zeros(1, dtype=np.int64)
+    pop = np.zeros(1, dtype=np.int8)
+    for v in cents[rest].tolist():
+        sums = np.concatenate([sums, sums + v])
+        pop = np.concatenate([pop, pop + 1])
+    zero = (sums == 0).astype(np.int8)
+    del sums
+
+    dp = np.zeros(1 << n, dtype=np.int8)
+    order = np.argsort(pop, kind="stable")
+    bounds = np.searchsorted(pop[order], np.arange(n + 2))
+    for k in range(1, n + 1):
+        if time.perf_counter() > deadline:
+            return None
+        masks = order[bounds[k]:bounds[k + 1]]
+        best = np.zeros(len(masks), dtype=np.int8)
+        for i in range(n):
+            bit = 1 << i
+            has = (masks & bit) != 0
+            best[has] = np.maximum(best[has], dp[masks[has] ^ bit])
+        dp[masks] = best + zero[masks]
+
+    # walk one optimal removal chain; every zero-sum mask on it closes a group
+    mask, current = (1 << n) - 1, []
+    while mask:
+        for i in range(n):
+            bit = 1 << i
+            if mask & bit and dp[mask ^ bit] + zero[mask] == dp[mask]:
+                break
+        current.append(rest[i])
+        mask ^= bit
+        if zero[mask]:
+            groups.append(current)
+            current = []
+    return groups
+
+
+def _pair_opposites(cents: np.ndarray):
+    """Split off exact (x, -x) pairs, which are always optimal on their own."""
+    pending: Dict[int, List[int]] = {}
+    groups, rest = [], []
+    for i, c in enumerate(cents.tolist()):
+        if c == 0:
+            continue
+        if pending.get(-c):
+            groups.append([pending[-c].pop(), i])
+        else:
+            pending.setdefault(c, []).append(i)
+    for idx in pending.values():
+        rest += idx
+    rest.sort()
+    return groups, rest
+
+
+# ---------- engine ----------
+class BalanceLedger:
+    """Running net balances, updated per expense instead of rescanning the log.
+
+    Adding an expense applies its delta vector (payer +amount, each sharer
+    -share); undo/remove applies the same delta negated, so both cost
+    O(people in the expense) no matter how long the log is.
+
+    Deltas are kept exact per expense currency; ``totals`` converts them into
+    the ledger's currency with ``rates`` (currency -> multiplier) once per
+    version. Expenses without a currency count at face value; currencies
+    with no rate (e.g. dropped from rates.json) are left out of the totals
+    and listed in ``unconverted`` instead of failing.
+    """
+
+    def __init__(self, people: Sequence[str], rates: Optional[Dict[str, float]] = None):
+        self.people = list(people)
+        self.index = {p: i for i, p in enumerate(self.people)}
+        self.rates = dict(rates or {})
+        self.native: Dict[str, np.ndarray] = {}  # currency -> per-person cents in that currency
+        self.count = 0
+        self.version = 0
+        self._totals = None     # (version, converted totals, unconverted currencies)
+        self._transfers = None  # (version, transfers)
+
+    @classmethod
+    def from_native(
+        cls, people: Sequence[str], native: Dict[str, np.ndarray], rates: Optional[Dict[str, float]] = None,
+        count: int = 0,
+    ) -> "BalanceLedger":
+        """Ledger seeded with per-currency totals (e.g. the journal's balances table)."""
+        ledger = cls(people, rates)
+        ledger.native = {c: np.array(v, dtype=np.int64) for c, v in native.items()}
+        ledger.count = count
+        return ledger
+
+    def _apply(self, expense: Dict, sign: int):
+        idx = self.index
+        code = expense.get("currency", "")
+        vec = self.native.get(code)
+        if vec is None:
+            vec = self.native[code] = np.zeros(len(self.people), dtype=np.int64)
+        vec[idx[expense["paid_by"]]] += sign * to_cents(expense["amount"])
+        for p, owed in expense["shares"].items():
+            vec[idx[p]] -= sign * to_cents(owed)
+        self.count += sign
+        self.version += 1
+
+    def append(self, expense: Dict):
+        self._apply(expense, 1)
+
+    def remove(self, expense: Dict):
+        self._apply(expense, -1)
+
+    def clear(self):
+        self.native = {}
+        self.count = 0
+        self.version += 1
+
+    @property
+    def totals(self) -> np.ndarray:
+        """Net balance per person in cents of the ledger's currency."""
+        if self._totals is None or self._totals[0] != self.version:
+            acc = np.zeros(len(self.people), dtype=np.float64)
+            missing = []
+            for code, vec in self.native.items():
+                rate = self.rates.get(code, None if code else 1.0)
+                if rate is None:
+                    if vec.any():
+                        missing.append(code)
+                    continue
+                acc += vec * rate
+            self._totals = (self.version, np.rint(acc).astype(np.int64), sorted(missing))
+        return self._totals[1]
+
+    @property
+    def unconverted(self) -> List[str]:
+        """Currencies with balances but no rate; their expenses are not in ``totals``."""
+        self.totals  # refreshes the cache for this version
+        return self._totals[2]
+
+    def balances(self) -> Dict[str, float]:
+        return {p: from_cents(c) for p, c in zip(self.people, self.totals.tolist())}
+
+    def transfers(self, time_budget: float = DEFAULT_TIME_BUDGET) -> List[Dict]:
+        """Settlement for the current totals, solved once per ledger version."""
+        if self._transfers is None or self._transfers[0] != self.version:
+            self._transfers = (self.version, optimal_transfers(self.people, self.totals, time_budget))
+        return self._transfers[1]
+
+
+# ---------- cross-group netting ----------
+class NettedDebts:
+    """Result of netting many groups' balances into one settlement.
+
+    ``transfers`` settles everyone's net position at once.
+    """
+
+    def __init__(self, people: List[str], net: np.ndarray, transfers: List[Dict], group_transfers: int):
+        self.people = people
+        self.net = net
+        self.transfers = transfers
+        self.group_transfers = group_transfers  # transfers if every group settled alone
+
+
+def net_groups(
+    group_ids: np.ndarray, names: Sequence[str], cents: np.ndarray, time_budget: float = DEFAULT_TIME_BUDGET
+) -> NettedDebts:
+    """Net per-group balances across all groups.
+
+    People are matched across groups by case-insensitive name. Rows of the
+    same person in one group (e.g. one per expense currency, already
+    converted) are summed first. Each row was rounded on its own, so a group
+    a few cents off zero has the difference taken up by its largest balance.
+    """
+    keys, first, person = np.unique(
+        np.array([n.strip().lower() for n in names], dtype=object), return_index=True, return_inverse=True
+    )
+    people = [names[i] for i in first.tolist()]
+
+    # one row per (group, person), sorted by group
+    rows = np.stack([np.asarray(group_ids, dtype=np.int64), person.reshape(-1)], axis=1).reshape(-1, 2)
+    pairs, inv = np.unique(rows, axis=0, return_inverse=True)
+    group_ids, person = pairs[:, 0], pairs[:, 1]
+    cents, rows = np.zeros(len(pairs), dtype=np.int64), np.asarray(cents, dtype=np.int64)
+    np.add.at(cents, inv.reshape(-1), rows)
+    if len(cents):
+        starts = np.flatnonzero(np.r_[True, np.diff(group_ids) != 0])
+        largest = np.lexsort((-np.abs(cents), group_ids))[starts]
+        cents[largest] -= np.add.reduceat(cents, starts)
+
+    net = np.zeros(len(people), dtype=np.int64)
+    np.add.at(net, person, cents)
+
+    # transfers if each group settled on its own
+    bounds = np.flatnonzero(np.diff(group_ids)) + 1
+    transfers = 0
+    for members in np.split(np.arange(len(group_ids)), bounds):
+        transfers += len(greedy_pairs(cents[members])[2])
+
+    return NettedDebts(people, net, optimal_transfers(people, net, time_budget), transfers)
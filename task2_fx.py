@@ -0,0 +1,49 @@
+# task2_fx.py
+"""Offline FX rates for the expense splitter (task2.py).
+
+Rates come from a local JSON file (units of each currency per 1 unit of the
+base currency). The full cross-rate matrix is built once per file version,
+so converting balances is a lookup plus a multiply, not a per-row
+calculation on every rerun.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+RATES_FILE = Path(__file__).with_name("rates.json")
+
+
+def rates_version(path: Path = RATES_FILE) -> Tuple[int, int]:
+    """Cheap change token for the rates file: (mtime_ns, size)."""
+    info = path.stat()
+    return info.st_mtime_ns, info.st_size
+
+
+class FxRates:
+    """Cross-rate matrix: ``matrix[i, j]`` is units of ``codes[j]`` per 1 ``codes[i]``."""
+
+    def __init__(self, per_base: Dict[str, float], version: Tuple[int, int] = (0, 0), as_of: str = ""):
+        self.codes = list(per_base)
+        self.index = {c: i for i, c in enumerate(self.codes)}
+        units = np.array([float(per_base[c]) for c in self.codes])
+        self.matrix = units[None, :] / units[:, None]
+        self.version = version
+        self.as_of = as_of
+
+    def factors(self, to: str) -> Dict[str, float]:
+        """Multiplier from every known currency into ``to``."""
+        col = self.matrix[:, self.index[to]].tolist()
+        return dict(zip(self.codes, col))
+
+    def convert_cents(self, cents: np.ndarray, codes: Sequence[str], to: str) -> np.ndarray:
+        """Convert a column of cent amounts, each in its own currency, into ``to``."""
+        uniq, inv = np.unique(np.asarray(codes, dtype=object), return_inverse=True)
+        col = self.matrix[[self.index[c] for c in uniq.tolist()], self.index[to]]
+        return np.rint(np.asarray(cents, dtype=np.float64) * col[inv]).astype(np.int64)
+
+
+def load_rates(path: Path = RATES_FILE) -> FxRates:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return FxRates(data["rates"], rates_version(path), data.get("as_of", ""))
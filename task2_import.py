@@ -0,0 +1,108 @@
+# task2_import.py
+"""Streaming CSV import for the expense splitter (task2.py).
+
+Bank exports are read in chunks. Each chunk is validated with the Add
+Expense form's rules, split with one vectorized ``allocate_splits`` call,
+and appended to the journal in a single transaction together with its
+balance delta. Memory is bounded by the chunk size, not the file size.
+"""
+import json
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from import_report import ImportReport
+from task2_journal import ExpenseJournal
+from task2_money import EQUALLY, allocate_splits, to_cents_array
+
+CHUNK_ROWS = 50_000
+MAX_AMOUNT = 1e12  # keeps cents (and a chunk's summed balance delta) far inside int64
+MAX_WEIGHT = 1e12  # per participant column; a row's weights then sum without overflow
+
+
+def import_expenses(
+    journal: ExpenseJournal,
+    group_id: int,
+    source,
+    people: Sequence[str],
+    desc_col: str,
+    amount_col: str,
+    paid_by_col: str,
+    currency: str,
+    split_mode: str = EQUALLY,
+    chunk_rows: int = CHUNK_ROWS,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> ImportReport:
+    """Stream ``source`` (path or file-like CSV) into the group's journal.
+
+    Every row is recorded in ``currency``. Payer names match the group's
+    people case-insensitively. For split modes other than Equally, columns
+    named after people hold each row's percent, shares or exact amounts.
+    Rows without any of them split equally, like the form does when every
+    input is zero.
+    """
+    people = list(people)
+    lookup = {p.lower(): i for i, p in enumerate(people)}
+    # shares JSON via one %-template instead of json.dumps per row
+    shares_tmpl = "{" + ", ".join(json.dumps(p).replace("%", "%%") + ": %d" for p in people) + "}"
+    report = ImportReport()
+    seen = 0
+
+    for chunk in pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False):
+        lines = np.arange(seen, seen + len(chunk)) + 2  # 1-based, after the header line
+        seen += len(chunk)
+
+        amount = pd.to_numeric(chunk[amount_col].str.replace(",", "", regex=False).str.strip(), errors="coerce")
+        payer = chunk[paid_by_col].str.strip().str.lower().map(lookup)
+        values = amount.to_numpy(dtype=np.float64)
+        weights = _split_weights(chunk, people, split_mode)
+        # split every row with out-of-range inputs zeroed; those rows are rejected below anyway
+        usable = np.isfinite(values) & (values > 0) & (values <= MAX_AMOUNT)
+        sane = np.isfinite(weights) & (np.abs(weights) <= MAX_WEIGHT)
+        cents = to_cents_array(np.where(usable, values, 0.0))
+        shares = allocate_splits(cents, [split_mode] * len(chunk), np.where(sane, weights, 0.0))
+        reason = np.select(
+            [amount.isna().to_numpy(), ~np.isfinite(values), values <= 0, values > MAX_AMOUNT,
+             ~sane.all(axis=1), shares.sum(axis=1) != cents, payer.isna().to_numpy()],
+            ["Amount is not a number.", "Amount must be finite.", "Amount must be greater than zero.",
+             f"Amount is over {MAX_AMOUNT:,.0f}.", f"Split values must be finite and at most {MAX_WEIGHT:,.0f}.",
+             "Split does not sum to total.", "Unknown payer."],
+            default="",
+        )
+        bad = reason != ""
+        if bad.any():
+            report.reject(lines[bad], reason[bad], chunk.loc[bad, [desc_col, amount_col, paid_by_col]])
+        ok = ~bad
+        n = int(ok.sum())
+        if n:
+            cents, shares = cents[ok], shares[ok]
+            payer_idx = payer.to_numpy()[ok].astype(np.int64)
+
+            delta = np.bincount(payer_idx, weights=cents, minlength=len(people)) - shares.sum(axis=0)
+            desc = chunk.loc[ok, desc_col].str.strip().replace("", "Expense")
+            rows = zip(
+                desc.tolist(),
+                cents.tolist(),
+                [people[i] for i in payer_idx.tolist()],
+                [split_mode] * n,
+                [shares_tmpl % tuple(r) for r in shares.tolist()],
+                [currency] * n,
+            )
+            journal.append_batch(
+                group_id, rows, {(p, currency): int(d) for p, d in zip(people, np.rint(delta).tolist())}, n
+            )
+            report.imported += n
+        if on_progress is not None:
+            on_progress(seen)
+    return report
+
+
+def _split_weights(chunk: pd.DataFrame, people: List[str], split_mode: str) -> np.ndarray:
+    weights = np.zeros((len(chunk), len(people)))
+    if split_mode == EQUALLY:
+        return weights
+    for j, p in enumerate(people):
+        if p in chunk.columns:
+            weights[:, j] = pd.to_numeric(chunk[p], errors="coerce").fillna(0.0).to_numpy()
+    return weights
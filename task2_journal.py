@@ -0,0 +1,296 @@
+# task2_journal.py
+"""SQLite-backed expense journal for the expense splitter (task2.py).
+
+One database file holds any number of groups. Expenses are appended as
+rows, and the same transaction updates a per-group ``balances`` aggregate
+(one row per person and expense currency). So opening a group reads a few
+rows per person however long its log is, and
+the log itself is read a page at a time. The database runs in WAL mode so
+readers in other sessions don't block the writer.
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from task2_money import from_cents, to_cents
+
+JOURNAL_FILE = Path("expenses.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS groups (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE,
+    currency    TEXT NOT NULL DEFAULT 'AED',
+    people      TEXT NOT NULL DEFAULT '[]',    -- JSON list, display order
+    n_expenses  INTEGER NOT NULL DEFAULT 0,
+    rev         INTEGER NOT NULL DEFAULT 0     -- bumped on every expense change
+);
+CREATE TABLE IF NOT EXISTS expenses (
+    id            INTEGER PRIMARY KEY,
+    group_id      INTEGER NOT NULL REFERENCES groups(id),
+    description   TEXT NOT NULL,
+    amount_cents  INTEGER NOT NULL,
+    paid_by       TEXT NOT NULL,
+    split_mode    TEXT NOT NULL,
+    shares        TEXT NOT NULL,               -- JSON {person: cents}
+    currency      TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS expenses_by_group ON expenses(group_id, id);
+CREATE INDEX IF NOT EXISTS expenses_by_payer ON expenses(group_id, paid_by, id);
+CREATE INDEX IF NOT EXISTS expenses_by_amount ON expenses(group_id, amount_cents);
+"""
+
+BALANCES_TABLE = """
+CREATE TABLE IF NOT EXISTS balances (
+    group_id  INTEGER NOT NULL REFERENCES groups(id),
+    person    TEXT NOT NULL,
+    currency  TEXT NOT NULL,
+    cents     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (group_id, person, currency)
+) WITHOUT ROWID
+"""
+
+UPSERT_BALANCE = """
+INSERT INTO balances (group_id, person, currency, cents) VALUES (?, ?, ?, ?)
+ON CONFLICT (group_id, person, currency) DO UPDATE SET cents = cents + excluded.cents
+"""
+
+EXPENSE_COLUMNS = "id, description, amount_cents, paid_by, split_mode, shares, currency"
+SORT_COLUMNS = {"id": "id", "amount": "amount_cents", "desc": "description", "paid_by": "paid_by"}
+
+
+def expense_delta(expense: Dict, sign: int = 1) -> Dict[Tuple[str, str], int]:
+    """Balance change (cents, keyed by person and currency) caused by one expense."""
+    cur = expense["currency"]
+    delta = {(expense["paid_by"], cur): sign * to_cents(expense["amount"])}
+    for p, owed in expense["shares"].items():
+        delta[(p, cur)] = delta.get((p, cur), 0) - sign * to_cents(owed)
+    return delta
+
+
+def _row_to_expense(row: Tuple) -> Dict:
+    eid, desc, amount_cents, paid_by, split_mode, shares, currency = row
+    return {
+        "id": eid,
+        "desc": desc,
+        "amount": from_cents(amount_cents),
+        "paid_by": paid_by,
+        "split_mode": split_mode,
+        "shares": {p: from_cents(c) for p, c in json.loads(shares).items()},
+        "currency": currency,
+    }
+
+
+def _log_filter(group_id: int, payer: Optional[str], search: Optional[str]) -> Tuple[str, Tuple]:
+    where, args = "group_id = ?", (group_id,)
+    if payer:
+        where += " AND paid_by = ?"
+        args += (payer,)
+    if search:
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where += " AND description LIKE ? ESCAPE '\\'"
+        args += (f"%{escaped}%",)
+    return where, args
+
+
+class ExpenseJournal:
+    """Append-only expense log plus maintained balances, keyed by group."""
+
+    def __init__(self, path: Path = JOURNAL_FILE):
+        # one connection shared by all sessions; the lock serializes access
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.RLock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA + ";" + BALANCES_TABLE)
+        self._migrate()
+
+    def _migrate(self):
+        """Upgrade journals written before expenses carried their own currency."""
+        columns = {r[1] for r in self._db.execute("PRAGMA table_info(expenses)")}
+        if "currency" in columns:
+            return
+        with self._db:
+            self._db.execute("ALTER TABLE expenses ADD COLUMN currency TEXT NOT NULL DEFAULT ''")
+            self._db.execute(
+                "UPDATE expenses SET currency = (SELECT currency FROM groups WHERE groups.id = expenses.group_id)"
+            )
+            self._db.execute("ALTER TABLE balances RENAME TO balances_v1")
+            self._db.execute(BALANCES_TABLE)
+            self._db.execute(
+                "INSERT INTO balances (group_id, person, currency, cents) "
+                "SELECT b.group_id, b.person, g.currency, b.cents FROM balances_v1 b JOIN groups g ON g.id = b.group_id"
+            )
+            self._db.execute("DROP TABLE balances_v1")
+
+    # ---------- groups ----------
+    def groups(self) -> List[Tuple[int, str]]:
+        with self._lock:
+            return self._db.execute("SELECT id, name FROM groups ORDER BY id").fetchall()
+
+    def create_group(self, name: str, currency: str = "AED") -> int:
+        """Create a group (or return the existing one with that name)."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO groups (name, currency) VALUES (?, ?)", (name, currency)
+            )
+            return self._db.execute("SELECT id FROM groups WHERE name = ?", (name,)).fetchone()[0]
+
+    def group(self, group_id: int) -> Dict:
+        with self._lock:
+            name, currency, people, n, rev = self._db.execute(
+                "SELECT name, currency, people, n_expenses, rev FROM groups WHERE id = ?", (group_id,)
+            ).fetchone()
+        return {"name": name, "currency": currency, "people": json.loads(people), "n_expenses": n, "rev": rev}
+
+    def set_people(self, group_id: int, people: Sequence[str]):
+        with self._lock, self._db:
+            self._db.execute("UPDATE groups SET people = ? WHERE id = ?", (json.dumps(list(people)), group_id))
+
+    def set_currency(self, group_id: int, currency: str):
+        with self._lock, self._db:
+            self._db.execute("UPDATE groups SET currency = ? WHERE id = ?", (currency, group_id))
+
+    def revision(self, group_id: int) -> int:
+        with self._lock:
+            return self._revision(group_id)
+
+    # ---------- expenses ----------
+    def append(self, group_id: int, expense: Dict) -> int:
+        """Append one expense and fold it into the group's balances; returns the new revision."""
+        shares = {p: to_cents(v) for p, v in expense["shares"].items()}
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO expenses (group_id, description, amount_cents, paid_by, split_mode, shares, currency) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (group_id, expense["desc"], to_cents(expense["amount"]), expense["paid_by"],
+                 expense["split_mode"], json.dumps(shares), expense["currency"]),
+            )
+            return self._apply(group_id, expense_delta(expense), 1)
+
+    def append_batch(self, group_id: int, rows: Iterable[Tuple], delta: Dict[Tuple[str, str], int], n_rows: int):
+        """Bulk append in one transaction.
+
+        ``rows`` are (description, amount_cents, paid_by, split_mode, shares_json,
+        currency) tuples and ``delta`` is their combined balance change, keyed
+        by (person, currency).
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO expenses (group_id, description, amount_cents, paid_by, split_mode, shares, currency) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((group_id,) + tuple(r) for r in rows),
+            )
+            self._apply(group_id, delta, n_rows)
+
+    def pop_last(self, group_id: int) -> Tuple[Optional[Dict], int]:
+        """Remove the newest expense (undo) and reverse its balance change.
+
+        Returns the removed expense (None if there was none) and the revision after it.
+        """
+        with self._lock, self._db:
+            row = self._db.execute(
+                f"SELECT {EXPENSE_COLUMNS} FROM expenses WHERE group_id = ? ORDER BY id DESC LIMIT 1",
+                (group_id,),
+            ).fetchone()
+            if row is None:
+                return None, self._revision(group_id)
+            expense = _row_to_expense(row)
+            self._db.execute("DELETE FROM expenses WHERE id = ?", (expense["id"],))
+            return expense, self._apply(group_id, expense_delta(expense, -1), -1)
+
+    def clear(self, group_id: int) -> int:
+        """Delete all of a group's expenses; returns the new revision."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM expenses WHERE group_id = ?", (group_id,))
+            self._db.execute("DELETE FROM balances WHERE group_id = ?", (group_id,))
+            self._db.execute("UPDATE groups SET n_expenses = 0, rev = rev + 1 WHERE id = ?", (group_id,))
+            return self._revision(group_id)
+
+    def _apply(self, group_id: int, delta: Dict[Tuple[str, str], int], n_added: int) -> int:
+        self._db.executemany(UPSERT_BALANCE, [(group_id, p, cur, c) for (p, cur), c in delta.items()])
+        self._db.execute(
+            "UPDATE groups SET n_expenses = n_expenses + ?, rev = rev + 1 WHERE id = ?", (n_added, group_id)
+        )
+        return self._revision(group_id)
+
+    def _revision(self, group_id: int) -> int:
+        return self._db.execute("SELECT rev FROM groups WHERE id = ?", (group_id,)).fetchone()[0]
+
+    # ---------- reads ----------
+    def balances_by_currency(self, group_id: int, people: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Maintained net balance per person (``people`` order), one vector per expense currency."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT person, currency, cents FROM balances WHERE group_id = ?", (group_id,)
+            ).fetchall()
+        index = {p: i for i, p in enumerate(people)}
+        native: Dict[str, np.ndarray] = {}
+        for person, cur, cents in rows:
+            if person in index:
+                native.setdefault(cur, np.zeros(len(index), dtype=np.int64))[index[person]] = cents
+        return native
+
+    def all_balances(self) -> Tuple[np.ndarray, List[str], List[str], np.ndarray]:
+        """Non-zero balances of every group as columns: group id, person, currency, cents."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT group_id, person, currency, cents FROM balances WHERE cents != 0"
+            ).fetchall()
+        group_ids = np.array([r[0] for r in rows], dtype=np.int64)
+        cents = np.array([r[3] for r in rows], dtype=np.int64)
+        return group_ids, [r[1] for r in rows], [r[2] for r in rows], cents
+
+    def total_revision(self) -> int:
+        """Changes whenever any group's expenses change."""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(rev), 0) FROM groups").fetchone()[0]
+
+    def count(self, group_id: int, payer: Optional[str] = None, search: Optional[str] = None) -> int:
+        where, args = _log_filter(group_id, payer, search)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM expenses WHERE {where}", args).fetchone()[0]
+
+    def page(
+        self,
+        group_id: int,
+        offset: int,
+        limit: int,
+        sort: str = "id",
+        descending: bool = False,
+        payer: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> List[Dict]:
+        """One page of the log, sorted and filtered in SQL (default: oldest first).
+
+        ``sort`` is a key of SORT_COLUMNS; ``payer`` matches exactly and
+        ``search`` is a case-insensitive substring of the description.
+        """
+        where, args = _log_filter(group_id, payer, search)
+        direction = "DESC" if descending else "ASC"
+        order = f"{SORT_COLUMNS[sort]} {direction}, id {direction}"
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {EXPENSE_COLUMNS} FROM expenses WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                args + (limit, offset),
+            ).fetchall()
+        return [_row_to_expense(r) for r in rows]
+
+    def iter_expenses(self, group_id: int, chunk: int = 5000) -> Iterator[Dict]:
+        """Whole log, oldest first, fetched in chunks (keyset pagination)."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT {EXPENSE_COLUMNS} FROM expenses WHERE group_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (group_id, last_id, chunk),
+                ).fetchall()
+            if not rows:
+                return
+            for r in rows:
+                yield _row_to_expense(r)
+            last_id = rows[-1][0]
@@ -0,0 +1,74 @@
+# task2_money.py
+"""Fixed-point money helpers for the expense splitter.
+
+Amounts are int64 cents. Splits use largest-remainder allocation: everyone
+gets the floor of their exact quota, and the leftover cents go to the
+largest fractional parts. So a split always sums exactly to its total, with
+no "last person absorbs rounding" step.
+"""
+from typing import Sequence
+
+import numpy as np
+
+EQUALLY = "Equally"
+BY_PERCENT = "By Percent (%)"
+BY_SHARES = "By Shares"
+BY_EXACT = "By Exact Amount"
+SPLIT_MODES = [EQUALLY, BY_PERCENT, BY_SHARES, BY_EXACT]
+
+
+def to_cents(x: float) -> int:
+    return int(round(float(x) * 100))
+
+
+def from_cents(c: int) -> float:
+    return int(c) / 100
+
+
+def money(x: float) -> float:
+    """Round a float amount to whole cents."""
+    return from_cents(to_cents(x))
+
+
+def to_cents_array(values) -> np.ndarray:
+    return np.rint(np.asarray(values, dtype=np.float64) * 100).astype(np.int64)
+
+
+def allocate(totals, weights) -> np.ndarray:
+    """Split each total (cents) in proportion to its weight row, largest remainder first.
+
+    ``totals`` has shape (n,) and ``weights`` (n, people); a 1-D weight vector
+    with a scalar total works too. Negative weights count as zero, and rows
+    whose weights are all zero split equally. Ties go to the earlier person.
+    """
+    w = np.clip(np.asarray(weights, dtype=np.float64), 0.0, None)
+    single = w.ndim == 1
+    w = np.atleast_2d(w)
+    totals = np.asarray(totals, dtype=np.int64).reshape(-1)
+    n, k = w.shape
+    if k == 0:
+        return np.zeros((n, 0), dtype=np.int64)
+
+    wsum = w.sum(axis=1, keepdims=True)
+    w = np.where(wsum > 0, w, 1.0)
+    quota = totals[:, None] * (w / w.sum(axis=1, keepdims=True))
+    cents = np.floor(quota).astype(np.int64)
+    short = totals - cents.sum(axis=1)
+
+    order = np.argsort(cents - quota, axis=1, kind="stable")  # largest fraction first
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.broadcast_to(np.arange(k), (n, k)), axis=1)
+    cents += rank < short[:, None]
+    return cents[0] if single else cents
+
+
+def allocate_splits(totals, modes: Sequence[str], weights) -> np.ndarray:
+    """Vectorized split for mixed modes: one row per expense, one column per person.
+
+    Percent, shares and exact amounts are all proportional weights (exact
+    amounts get scaled to the total). Rows in "Equally" mode ignore their
+    weights.
+    """
+    w = np.array(weights, dtype=np.float64, ndmin=2)
+    w[np.asarray(modes) == EQUALLY] = 1.0
+    return allocate(totals, w)
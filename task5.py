@@ -1,5 +1,12 @@
+import os
+import tempfile
+
+import pandas as pd
 import streamlit as st
 
+from task5_batch import DECIMAL_SEPARATORS, convert_csv
+from task5_units import REGISTRY
+
 st.set_page_config(page_title="All-in-One Unit Converter", page_icon="🔄", layout="centered")
 st.title("🔄 All-in-One Unit Converter")
 
@@ -10,19 +17,16 @@ st.caption(
 
 conv_type = st.selectbox(
     "Choose conversion type",
-    ["Currency", "Temperature", "Length", "Weight"],
+    ["Currency", "Temperature", "Length", "Weight", "Batch (CSV)"],
     index=0
 )
 
 st.divider()
 
 # ---------- Helpers ----------
-def convert_via_factor(value, from_unit, to_unit, unit_to_base_factor):
-    """Generic factor-based conversion (linear units): normalize to base, then to target."""
-    if from_unit not in unit_to_base_factor or to_unit not in unit_to_base_factor:
-        return None
-    base_value = value * unit_to_base_factor[from_unit]
-    return base_value / unit_to_base_factor[to_unit]
+def convert_via_factor(value, from_unit, to_unit, registry=REGISTRY):
+    """Registry conversion: one multiply-add from the precomputed factor matrix; None if the units don't convert."""
+    return registry.convert(value, from_unit, to_unit)
 
 def convert_currency(amount, from_code, to_code, usd_per_unit, custom_rate=None):
     """
@@ -94,63 +98,46 @@ elif conv_type == "Temperature":
     st.subheader("🌡️ Temperature")
 
     # Few-shot: Celsius -> Fahrenheit
-    t_from = st.selectbox("From", ["Celsius (°C)", "Fahrenheit (°F)"], index=0, key="t_from")
-    t_to   = st.selectbox("To",   ["Fahrenheit (°F)", "Celsius (°C)"], index=0, key="t_to")
+    temp_units = REGISTRY.keys("temperature")
+    t_from = st.selectbox("From", temp_units, index=temp_units.index("°C"), format_func=REGISTRY.label, key="t_from")
+    t_to   = st.selectbox("To",   temp_units, index=temp_units.index("°F"), format_func=REGISTRY.label, key="t_to")
 
     temp_value = st.number_input("Temperature value", value=25.0, step=0.1, format="%.2f")
 
-    def temp_convert(value, f_unit, t_unit):
-        if f_unit.startswith("Celsius") and t_unit.startswith("Fahrenheit"):
-            return value * 9.0/5.0 + 32.0
-        elif f_unit.startswith("Fahrenheit") and t_unit.startswith("Celsius"):
-            return (value - 32.0) * 5.0/9.0
-        else:
-            return value  # same unit
-
-    t_result = temp_convert(temp_value, t_from, t_to)
-    st.success(f"**{fmt_num(temp_value)} {t_from.split()[0]} = {fmt_num(t_result)} {t_to.split()[0]}**")
+    t_result = convert_via_factor(temp_value, t_from, t_to)
+    st.success(f"**{fmt_num(temp_value)} {REGISTRY.label(t_from).split()[0]} = {fmt_num(t_result)} {REGISTRY.label(t_to).split()[0]}**")
 
     with st.expander("Formula"):
-        st.code("°F = (°C × 9/5) + 32\n°C = (°F − 32) × 5/9")
+        st.code("°F = (°C × 9/5) + 32\n°C = (°F − 32) × 5/9\nK = °C + 273.15\n°R = K × 9/5")
 
 # ---------- Length ----------
 elif conv_type == "Length":
     st.subheader("📏 Length (and Area*)")
 
+    length_units = REGISTRY.keys("length")
+    area_units   = REGISTRY.keys("area")
+    all_units    = length_units + area_units
+
     st.caption(
-        "Length units: m, cm, mm, ft • Area units: sqm, sqft\n"
+        f"Length units: {', '.join(length_units)} • Area units: {', '.join(area_units)}\n"
         "*Note: You can only convert length↔length or area↔area. Mixed conversions are invalid."
     )
 
-    length_units = ["m", "cm", "mm", "ft"]
-    area_units   = ["sqm", "sqft"]
-    all_units    = length_units + area_units
-
     # Few-shot default: meter -> centimeter
     l_from = st.selectbox("From unit", all_units, index=all_units.index("m"))
     l_to   = st.selectbox("To unit",   all_units, index=all_units.index("cm"))
 
     value = st.number_input("Value", min_value=0.0, value=1.0, step=0.1)
 
-    # Factors to base units
-    length_to_m = {"m": 1.0, "cm": 0.01, "mm": 0.001, "ft": 0.3048}
-    area_to_sqm = {"sqm": 1.0, "sqft": 0.09290304}
-
-    def is_length(u): return u in length_units
-    def is_area(u):   return u in area_units
-
-    if (is_length(l_from) and is_length(l_to)):
-        out = convert_via_factor(value, l_from, l_to, length_to_m)
-        st.success(f"**{fmt_num(value)} {l_from} = {fmt_num(out)} {l_to}**")
-    elif (is_area(l_from) and is_area(l_to)):
-        out = convert_via_factor(value, l_from, l_to, area_to_sqm)
+    out = convert_via_factor(value, l_from, l_to)
+    if out is not None:
         st.success(f"**{fmt_num(value)} {l_from} = {fmt_num(out)} {l_to}**")
     else:
         st.error("Invalid conversion: cannot convert between length and area units.")
 
     with st.expander("Tips & extras"):
-        st.markdown("- Lengths: m, cm, mm, ft")
-        st.markdown("- Areas: sqm, sqft")
+        st.markdown(f"- Lengths: {', '.join(length_units)}")
+        st.markdown(f"- Areas: {', '.join(area_units)}")
         st.markdown("- Example: **m → cm** (default)")
 
 # ---------- Weight ----------
@@ -158,21 +145,60 @@ elif conv_type == "Weight":
     st.subheader("⚖️ Weight / Mass")
 
     # Few-shot defaults (common): kilogram -> gram
-    w_from = st.selectbox("From unit", ["kg", "g", "mg", "lb"], index=0)
-    w_to   = st.selectbox("To unit",   ["g", "kg", "mg", "lb"], index=1)
+    mass_units = REGISTRY.keys("mass")
+    w_from = st.selectbox("From unit", mass_units, index=mass_units.index("kg"))
+    w_to   = st.selectbox("To unit",   mass_units, index=mass_units.index("g"))
 
     w_value = st.number_input("Value", min_value=0.0, value=1.0, step=0.1)
 
-    # Base is kilogram
-    to_kg = {
-        "kg": 1.0,
-        "g": 0.001,
-        "mg": 1e-6,
-        "lb": 0.45359237,
-    }
-
-    w_result = convert_via_factor(w_value, w_from, w_to, to_kg)
+    w_result = convert_via_factor(w_value, w_from, w_to)
     if w_result is None:
         st.error("Unsupported unit.")
     else:
         st.success(f"**{fmt_num(w_value)} {w_from} = {fmt_num(w_result)} {w_to}**")
+
+# ---------- Batch (CSV) ----------
+elif conv_type == "Batch (CSV)":
+    st.subheader("📄 Batch (CSV)")
+    st.caption("Convert a whole column of a spreadsheet. The result is added as a new column; other columns are kept as-is.")
+
+    up = st.file_uploader("CSV file", type=["csv"], key="batch_csv")
+    if up is not None:
+        header = list(pd.read_csv(up, nrows=0).columns)
+        up.seek(0)
+        b_col = st.selectbox("Column", header)
+        dimension = st.selectbox("Quantity", REGISTRY.dimensions(), format_func=str.capitalize)
+        b_units = REGISTRY.keys(dimension)
+        c1, c2 = st.columns(2)
+        b_from = c1.selectbox("From unit", b_units, index=0, format_func=REGISTRY.label)
+        b_to   = c2.selectbox("To unit",   b_units, index=min(1, len(b_units) - 1), format_func=REGISTRY.label)
+        b_decimal = st.radio(
+            "Decimal separator", list(DECIMAL_SEPARATORS), horizontal=True,
+            format_func=lambda d: f"“{d}” ({DECIMAL_SEPARATORS[d]})",
+            help="Cells that don't fit this convention are left empty and counted, not guessed.",
+        )
+
+        if st.button("Convert", type="primary"):
+            bar = st.progress(0.0, text="Converting…")
+            # stream to a temp file, so only one chunk is held at a time while converting
+            fd, out_path = tempfile.mkstemp(suffix=".csv")
+            try:
+                with os.fdopen(fd, "w", newline="", encoding="utf-8") as out:
+                    report = convert_csv(
+                        up, out, b_col, b_from, b_to, decimal=b_decimal,
+                        on_progress=lambda n: bar.progress(min(up.tell() / max(up.size, 1), 1.0), text=f"Converted {n:,} rows…"),
+                    )
+                with open(out_path, "rb") as f:
+                    st.download_button(
+                        "⬇️ Download converted CSV", f,
+                        file_name=f"{os.path.splitext(up.name)[0]}_{b_to}.csv", mime="text/csv",
+                    )
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.success(f"Converted {report.converted:,} value(s) into “{report.column}”.")
+                if report.skipped:
+                    st.warning(f"{report.skipped:,} blank or non-numeric cell(s) left empty (first on line {report.first_skipped}).")
+            finally:
+                bar.empty()
+                os.remove(out_path)
@@ -0,0 +1,110 @@
+# task5_batch.py
+"""Batch column conversion for the unit converter (task5.py).
+
+A CSV is read in chunks. Each chunk's column is parsed with one
+``pd.to_numeric`` call and converted as a single NumPy multiply-add with
+the registry's factors for the chosen pair. The chunk is then appended to
+the output with the result in a new column. Every other column is kept as
+text exactly as read, and memory is bounded by the chunk size.
+
+Numbers may use "." or "," as the decimal separator. Only separators in a
+well-formed thousands grouping ("1,234.5" or "1.234,5") are stripped, so a
+cell like "1,5" under the "." convention is skipped and reported, never
+read as 15.
+
+The Streamlit page holds the upload and the finished file in memory; for
+files larger than that, run this module on paths:
+
+    python task5_batch.py in.csv out.csv --column length --from ft --to m [--decimal ,]
+"""
+import argparse
+import re
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from task5_units import REGISTRY, UnitRegistry
+
+CHUNK_ROWS = 100_000
+DECIMAL_SEPARATORS = {".": "1,234.5", ",": "1.234,5"}  # separator -> example of the convention
+GROUPED = r"[+-]?\d{1,3}(?:%s\d{3})+(?:%s\d*)?"
+
+
+class BatchReport:
+    def __init__(self, column: str):
+        self.column = column  # name of the added column
+        self.converted = 0
+        self.skipped = 0      # blank or non-numeric cells, left empty in the output
+        self.first_skipped: Optional[int] = None  # 1-based line number, after the header line
+
+
+def output_column(column: str, to_unit: str) -> str:
+    return f"{column} ({to_unit})"
+
+
+def parse_numbers(cells: pd.Series, decimal: str = ".") -> np.ndarray:
+    """Floats from text cells; NaN for blank or malformed ones."""
+    thousands = "," if decimal == "." else "."
+    cells = cells.str.strip()
+    grouped = cells.str.fullmatch(GROUPED % (re.escape(thousands), re.escape(decimal)))
+    cells = cells.where(~grouped, cells.str.replace(thousands, "", regex=False))
+    if decimal != ".":
+        cells = cells.str.replace(decimal, ".", regex=False)
+    return pd.to_numeric(cells, errors="coerce").to_numpy(dtype=float)
+
+
+def convert_csv(
+    source,
+    out,
+    column: str,
+    from_unit: str,
+    to_unit: str,
+    registry: UnitRegistry = REGISTRY,
+    decimal: str = ".",
+    chunk_rows: int = CHUNK_ROWS,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> BatchReport:
+    """Stream ``source`` (path or file-like CSV) to ``out`` (text file-like) with ``column`` converted.
+
+    ``decimal`` is the separator the column's numbers use (a key of ``DECIMAL_SEPARATORS``).
+    """
+    factors = registry.factors(from_unit, to_unit)
+    if factors is None:
+        raise ValueError(f"Cannot convert {from_unit} to {to_unit}.")
+    report = BatchReport(output_column(column, to_unit))
+    seen = 0
+
+    for chunk in pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False):
+        if column not in chunk.columns:
+            raise ValueError(f"Column not found: {column}")
+        values = parse_numbers(chunk[column], decimal)
+        result = registry.convert(values, from_unit, to_unit)
+        bad = np.isnan(values)
+        if bad.any():
+            if report.first_skipped is None:
+                report.first_skipped = seen + int(np.argmax(bad)) + 2
+            report.skipped += int(bad.sum())
+        report.converted += len(values) - int(bad.sum())
+        chunk[report.column] = result
+        chunk.to_csv(out, header=seen == 0, index=False)
+        seen += len(chunk)
+        if on_progress is not None:
+            on_progress(seen)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="input CSV path")
+    parser.add_argument("out", help="output CSV path")
+    parser.add_argument("--column", required=True, help="column to convert")
+    parser.add_argument("--from", dest="from_unit", required=True, help="unit of the column, e.g. ft")
+    parser.add_argument("--to", dest="to_unit", required=True, help="unit to convert into, e.g. m")
+    parser.add_argument("--decimal", choices=list(DECIMAL_SEPARATORS), default=".", help="decimal separator")
+    args = parser.parse_args()
+    with open(args.out, "w", newline="", encoding="utf-8") as out:
+        report = convert_csv(args.source, out, args.column, args.from_unit, args.to_unit, decimal=args.decimal)
+    print(f"Converted {report.converted:,} value(s) into \"{report.column}\".")
+    if report.skipped:
+        print(f"{report.skipped:,} blank or non-numeric cell(s) left empty (first on line {report.first_skipped}).")
@@ -0,0 +1,140 @@
+# task5_units.py
+"""Unit registry for the unit converter (task5.py).
+
+Units are nodes of a graph, one connected component per dimension. An edge
+says ``to = from × scale + offset``: linear units have offset 0, and
+temperature scales are affine. At startup each dimension is walked once from
+its first unit. Composing the edges gives every unit's affine map to that
+base. From those maps come an n × n scale matrix and offset matrix, so any
+pair converts with one multiply-add. That also works on whole NumPy arrays.
+
+Adding a unit is one entry in ``UNITS`` and one in ``EDGES``; the
+selectboxes in task5.py list whatever the registry holds.
+"""
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+CANCEL_TOL = 1e-12  # affine results this close to zero (relative to the offset) are rounding noise
+
+# (dimension, key, label); the first unit of a dimension is its base
+UNITS = [
+    ("length", "m", "m"),
+    ("length", "cm", "cm"),
+    ("length", "mm", "mm"),
+    ("length", "ft", "ft"),
+    ("area", "sqm", "sqm"),
+    ("area", "sqft", "sqft"),
+    ("mass", "kg", "kg"),
+    ("mass", "g", "g"),
+    ("mass", "mg", "mg"),
+    ("mass", "lb", "lb"),
+    ("temperature", "°C", "Celsius (°C)"),
+    ("temperature", "°F", "Fahrenheit (°F)"),
+    ("temperature", "K", "Kelvin (K)"),
+    ("temperature", "°R", "Rankine (°R)"),
+]
+
+# (from, to, scale, offset): value in ``to`` = value in ``from`` × scale + offset
+EDGES = [
+    ("cm", "m", 0.01, 0.0),
+    ("mm", "cm", 0.1, 0.0),
+    ("ft", "m", 0.3048, 0.0),
+    ("sqft", "sqm", 0.09290304, 0.0),
+    ("g", "kg", 0.001, 0.0),
+    ("mg", "g", 0.001, 0.0),
+    ("lb", "kg", 0.45359237, 0.0),
+    ("°C", "K", 1.0, 273.15),
+    ("°F", "°C", 5.0 / 9.0, -160.0 / 9.0),
+    ("°R", "K", 5.0 / 9.0, 0.0),
+]
+
+
+class Unit(NamedTuple):
+    key: str
+    label: str
+    dimension: str
+    index: int  # row/column in its dimension's matrices
+
+
+class UnitRegistry:
+    def __init__(self, units=UNITS, edges=EDGES):
+        self.units: Dict[str, Unit] = {}
+        self._members: Dict[str, List[str]] = {}
+        for dimension, key, label in units:
+            if key in self.units:
+                raise ValueError(f"Duplicate unit: {key}")
+            members = self._members.setdefault(dimension, [])
+            self.units[key] = Unit(key, label, dimension, len(members))
+            members.append(key)
+
+        graph: Dict[str, List[Tuple[str, float, float]]] = {k: [] for k in self.units}
+        for a, b, scale, offset in edges:
+            if self.units[a].dimension != self.units[b].dimension:
+                raise ValueError(f"Edge {a} → {b} joins two dimensions.")
+            graph[a].append((b, scale, offset))
+            graph[b].append((a, 1.0 / scale, -offset / scale))  # the inverse map
+
+        # per dimension: to_j = from_i × scale[i, j] + offset[i, j]
+        self.scale: Dict[str, np.ndarray] = {}
+        self.offset: Dict[str, np.ndarray] = {}
+        for dimension, members in self._members.items():
+            s, o = self._maps_to_base(graph, members)
+            self.scale[dimension] = s[:, None] / s[None, :]
+            self.offset[dimension] = (o[:, None] - o[None, :]) / s[None, :]
+
+    def _maps_to_base(self, graph, members: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """BFS from the base unit: each unit's (s, o) with base = value × s + o."""
+        s = np.full(len(members), np.nan)
+        o = np.full(len(members), np.nan)
+        base = members[0]
+        s[0], o[0] = 1.0, 0.0
+        queue = deque([base])
+        while queue:
+            u = queue.popleft()
+            i = self.units[u].index
+            for v, scale, offset in graph[u]:
+                j = self.units[v].index
+                if np.isnan(s[j]):
+                    # v = u × scale + offset and base = u × s_i + o_i, so base = v × s_i/scale + (o_i − offset × s_i/scale)
+                    s[j] = s[i] / scale
+                    o[j] = o[i] - offset * s[j]
+                    queue.append(v)
+        missing = [m for m, ok in zip(members, ~np.isnan(s)) if not ok]
+        if missing:
+            raise ValueError(f"No conversion path from {base} to: {', '.join(missing)}")
+        return s, o
+
+    # ---------- lookups ----------
+    def dimensions(self) -> List[str]:
+        return list(self._members)
+
+    def keys(self, dimension: str) -> List[str]:
+        return list(self._members[dimension])
+
+    def label(self, key: str) -> str:
+        return self.units[key].label
+
+    def factors(self, from_key: str, to_key: str) -> Optional[Tuple[float, float]]:
+        """(scale, offset) from one unit to another; None for unknown units or different dimensions."""
+        a, b = self.units.get(from_key), self.units.get(to_key)
+        if a is None or b is None or a.dimension != b.dimension:
+            return None
+        return float(self.scale[a.dimension][a.index, b.index]), float(self.offset[a.dimension][a.index, b.index])
+
+    def convert(self, value, from_key: str, to_key: str):
+        """One multiply-add; ``value`` may be a number or a NumPy array. None if the units don't convert."""
+        f = self.factors(from_key, to_key)
+        if f is None:
+            return None
+        scale, offset = f
+        out = value * scale + offset
+        if offset:
+            # 491.67 °R is 0 °C, not 5.7e-14
+            out = np.where(np.abs(out) <= CANCEL_TOL * abs(offset), 0.0, out)
+            return float(out) if out.ndim == 0 else out
+        return out
+
+
+REGISTRY = UnitRegistry()
@@ -1,9 +1,13 @@
 # app.py
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
 from datetime import date, timedelta
-import time
+import calendar
+
+from task6_charts import WeekChart, last_7_days
+from task6_import import restore_log
+from task6_stats import HydrationStats
+from task6_store import HydrationStore
 
 st.set_page_config(page_title="Water Intake Tracker", page_icon="💧", layout="centered")
 
@@ -16,12 +20,32 @@ st.markdown("""
       .accent {color:#3B82F6;}
       .btn-row button {margin-right: .5rem;}
       .goal-line {border-top: 2px dashed #999; margin: 8px 0 0;}
+      .progress-label {font-size: 14px; margin-bottom: 4px;}
+      .progress-track {height: 10px; border-radius: 5px; background: rgba(59,130,246,0.15); overflow: hidden;}
+      .progress-fill {height: 100%; border-radius: 5px; background: #3B82F6;}
+      @media (prefers-reduced-motion: reduce) { .progress-fill {animation: none !important;} }
     </style>
 """, unsafe_allow_html=True)
 
 # ---------- INITIAL STATE ----------
-if "log" not in st.session_state:
-    st.session_state.log = {}
+@st.cache_resource
+def get_store() -> HydrationStore:
+    """One store per process: daily totals are memory-mapped, intake events appended to a log."""
+    return HydrationStore()
+
+@st.cache_resource(max_entries=4)
+def shared_stats(version: int, goal: int, _store: HydrationStore) -> HydrationStats:
+    return HydrationStats(_store.daily, goal)
+
+@st.cache_resource(max_entries=8)
+def week_chart(goal: int) -> WeekChart:
+    return WeekChart(goal)
+
+def get_stats(goal: int) -> HydrationStats:
+    """Prefix sums and streak runs, built once per data version and goal for all sessions."""
+    return shared_stats(store.version, goal, store)
+
+store = get_store()
 if "last_animate_from" not in st.session_state:
     st.session_state.last_animate_from = 0
 
@@ -34,7 +58,7 @@ goal_ml = st.sidebar.number_input("Daily goal (ml)", min_value=500, max_value=10
 st.sidebar.caption("Tip: 4,000 ml = 4 liters")
 
 if st.sidebar.button("Reset today's intake"):
-    st.session_state.log[date.today().isoformat()] = 0
+    store.set_total(date.today(), 0)
     st.session_state.last_animate_from = 0
     st.sidebar.success("Today’s intake reset.")
 
@@ -64,28 +88,26 @@ with st.container():
 
     add_clicked = st.button("Add intake", type="primary")
 
-    today_key = entry_date.isoformat()
-    current_ml = st.session_state.log.get(today_key, 0)
-    new_ml = current_ml
-
     added_amt = None
     if clicked_quick:
         added_amt = clicked_quick
-        new_ml = current_ml + clicked_quick
     elif add_clicked:
         added_amt = add_ml
-        new_ml = current_ml + add_ml
 
     if added_amt:
-        st.session_state.log[today_key] = new_ml
-        st.toast(f"Added {added_amt} ml for {entry_date.strftime('%b %d')}", icon="💧")
-        st.session_state.last_animate_from = current_ml
+        current_ml = store.total(entry_date)
+        try:
+            store.add(entry_date, added_amt)
+        except ValueError as e:
+            st.error(f"Not added: {e}")
+        else:
+            st.toast(f"Added {added_amt} ml for {entry_date.strftime('%b %d')}", icon="💧")
+            st.session_state.last_animate_from = current_ml
 
     st.markdown('</div>', unsafe_allow_html=True)
 
 # ---------- TODAY SUMMARY ----------
-today_key = date.today().isoformat()
-today_total = st.session_state.log.get(today_key, 0)
+today_total = store.total(date.today())
 pct = min(today_total / goal_ml, 1.0)
 remaining = max(goal_ml - today_total, 0)
 liters_today = today_total / 1000
@@ -102,21 +124,23 @@ with box3:
     st.markdown("Remaining")
     st.markdown(f'<div class="big-num">{remaining/1000:.2f} L</div>', unsafe_allow_html=True)
 
-# Animated progress bar
-progress_placeholder = st.empty()
-animate_from = st.session_state.last_animate_from if st.session_state.last_animate_from <= today_total else today_total
-animate_to = today_total
-animate_steps = max(int(abs(animate_to - animate_from) / 100), 1)
-
-if animate_to > animate_from:
-    for step in range(animate_steps + 1):
-        val = animate_from + (animate_to - animate_from) * (step / animate_steps)
-        progress = min(val / goal_ml, 1.0)
-        progress_placeholder.progress(progress, text=f"Daily progress: {int(progress*100)}%")
-        time.sleep(0.01)
-    st.session_state.last_animate_from = today_total
-else:
-    progress_placeholder.progress(pct, text=f"Daily progress: {int(pct*100)}%")
+# Animated progress bar: the browser animates from the last shown value, one element per run
+def progress_html(frm: float, to: float) -> str:
+    frm_pct, to_pct = round(frm * 100, 1), round(to * 100, 1)
+    keyframes, animation = "", ""
+    if to_pct > frm_pct:
+        # a keyframes name unique to the pair, so a new value replays the animation
+        name = f"fill-{frm_pct:g}-{to_pct:g}".replace(".", "_")
+        keyframes = f"<style>@keyframes {name} {{from {{width: {frm_pct}%;}} to {{width: {to_pct}%;}}}}</style>"
+        animation = f" animation: {name} 0.6s ease-out;"
+    return (
+        f'{keyframes}<div class="progress-label">Daily progress: {int(to * 100)}%</div>'
+        f'<div class="progress-track"><div class="progress-fill" style="width: {to_pct}%;{animation}"></div></div>'
+    )
+
+animate_from = min(st.session_state.last_animate_from, today_total)
+st.markdown(progress_html(min(animate_from / goal_ml, 1.0), pct), unsafe_allow_html=True)
+st.session_state.last_animate_from = today_total
 
 if today_total >= goal_ml:
     st.success("Goal reached — great job staying hydrated! 🎉")
@@ -125,58 +149,15 @@ if today_total >= goal_ml:
 # ---------- WEEKLY CHART ----------
 st.subheader("This Week")
 
-def last_7_days():
-    return [date.today() - timedelta(days=i) for i in range(6, -1, -1)]
-
-week_days = last_7_days()
-records = []
-for d in week_days:
-    key = d.isoformat()
-    ml = st.session_state.log.get(key, 0)
-    records.append({"date": d, "ml": ml, "liters": ml/1000})
-
-df = pd.DataFrame(records)
-
-# ✅ Convert to datetime so .dt works (this fixes your error)
-df["date"] = pd.to_datetime(df["date"])
-
-# Streaks (days where goal met)
-streak = 0
-for d in reversed(week_days):
-    if st.session_state.log.get(d.isoformat(), 0) >= goal_ml:
-        streak += 1
-    else:
-        break
-
-# Interactive Plotly bar + goal line
-fig = go.Figure()
-fig.add_bar(
-    x=df["date"].dt.strftime("%a %d"),
-    y=df["liters"],
-    name="Intake (L)",
-    hovertemplate="%{x}<br>%{y:.2f} L<extra></extra>"
-)
-fig.add_trace(go.Scatter(
-    x=df["date"].dt.strftime("%a %d"),
-    y=[goal_ml/1000]*len(df),
-    mode="lines",
-    name="Daily Goal",
-    line=dict(dash="dash", width=2),
-    hovertemplate="Goal: %{y:.2f} L<extra></extra>"
-))
-fig.update_layout(
-    yaxis_title="Liters",
-    xaxis_title="Day",
-    bargap=0.2,
-    hovermode="x unified",
-    height=380,
-    margin=dict(l=10, r=10, t=10, b=10)
-)
-st.plotly_chart(fig, use_container_width=True)
+# One figure per goal for the whole process; a logged intake patches just that day's bar
+week_days = last_7_days(date.today())
+st.plotly_chart(week_chart(goal_ml).sync(store, date.today()), use_container_width=True)
 
 # ---------- EXTRA INSIGHTS ----------
-met_days = int((df["ml"] >= goal_ml).sum())
-avg_liters = float(df["liters"].mean()) if len(df) else 0.0
+stats = get_stats(goal_ml)
+met_days = stats.days_met(week_days[0], week_days[-1])
+avg_liters = stats.average(week_days[0], week_days[-1]) / 1000
+streak = stats.current_streak(date.today())  # not limited to this week
 
 i1, i2, i3 = st.columns(3)
 with i1:
@@ -186,26 +167,77 @@ with i2:
 with i3:
     st.metric("Current Streak", f"{streak} days")
 
+# ---------- HISTORY ----------
+st.subheader("History")
+
+def range_metrics(start: date, end: date):
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Total (L)", f"{stats.total(start, end) / 1000:,.1f}")
+    m2.metric("Avg / Day (L)", f"{stats.average(start, end) / 1000:.2f}")
+    m3.metric("Days Met Goal", f"{stats.days_met(start, end)}/{(end - start).days + 1}")
+    m4.metric("Longest Streak", f"{stats.longest_streak(start, end)} days")
+
+view = st.radio("View", ["Month", "Year", "Range"], horizontal=True)
+first_year = stats.first_day.year if stats.first_day else date.today().year
+years = list(range(date.today().year, first_year - 1, -1))
+if view == "Month":
+    y1, y2 = st.columns(2)
+    year = y1.selectbox("Year", years, key="month_year")
+    month = y2.selectbox("Month", range(1, 13), index=date.today().month - 1, format_func=lambda m: calendar.month_name[m])
+    start, end = date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+    range_metrics(start, end)
+    month_l = stats.series(start, end) / 1000
+    st.bar_chart(month_l.set_axis(month_l.index.day).rename("Liters"))
+elif view == "Year":
+    year = st.selectbox("Year", years, key="heatmap_year")
+    start, end = date(year, 1, 1), date(year, 12, 31)
+    range_metrics(start, end)
+    grid = stats.year_grid(year)
+    heat = go.Figure(go.Heatmap(
+        z=grid.to_numpy(), x=list(range(1, grid.shape[1] + 1)), y=list(grid.index),
+        colorscale="Blues", zmin=0, zmax=goal_ml / 1000, xgap=2, ygap=2,
+        hovertemplate="Week %{x}, %{y}<br>%{z:.2f} L<extra></extra>", colorbar=dict(title="L"),
+    ))
+    heat.update_layout(height=260, yaxis=dict(autorange="reversed"), xaxis_title="Week", margin=dict(l=10, r=10, t=10, b=10))
+    st.plotly_chart(heat, use_container_width=True)
+else:
+    picked = st.date_input("Date range", value=(date.today() - timedelta(days=29), date.today()))
+    if isinstance(picked, tuple) and len(picked) == 2:
+        start, end = picked
+        range_metrics(start, end)
+        st.bar_chart((stats.series(start, end) / 1000).rename("Liters"))
+    else:
+        st.info("Pick an end date.")
+
 st.markdown("---")
 with st.expander("📦 Data & Backup"):
-    df_export = pd.DataFrame(
-        [{"date": k, "ml": v} for k, v in sorted(st.session_state.log.items())]
-    )
+    df_export = store.to_frame()
     csv = df_export.to_csv(index=False).encode("utf-8")
     st.download_button("Download log as CSV", csv, "water_log.csv", "text/csv")
 
     up = st.file_uploader("Restore/upload log (CSV with columns: date, ml)", type=["csv"])
-    if up is not None:
+    if up is not None and st.button("Restore", type="primary"):
+        bar = st.progress(0.0, text="Restoring…")
         try:
-            imported = pd.read_csv(up)
-            imported["date"] = pd.to_datetime(imported["date"]).dt.date
-            merged = {}
-            for _, row in imported.iterrows():
-                k = row["date"].isoformat()
-                merged[k] = merged.get(k, 0) + int(row["ml"])
-            st.session_state.log.update(merged)
-            st.success("Log imported successfully.")
+            report = restore_log(
+                store, up,
+                on_progress=lambda n: bar.progress(min(up.tell() / max(up.size, 1), 1.0), text=f"Read {n:,} rows…"),
+            )
         except Exception as e:
             st.error(f"Import failed: {e}")
+        else:
+            st.success(f"Log imported successfully: {report.imported:,} row(s), {report.days:,} day(s) updated.")
+            if report.rejected:
+                errors = report.errors_frame()
+                st.warning(f"Skipped {report.rejected:,} bad row(s).")
+                st.dataframe(errors, use_container_width=True)
+                st.download_button(
+                    "⬇️ Download Error Report (CSV)",
+                    data=errors.to_csv(index=False).encode("utf-8"),
+                    file_name="import_errors.csv",
+                    mime="text/csv",
+                )
+        finally:
+            bar.empty()
 
 st.caption("Stay consistent. Small sips add up! 💙")
@@ -0,0 +1,94 @@
+# task6_charts.py
+"""The water tracker's "This Week" Plotly chart, built once and patched (task6.py).
+
+``WeekChart`` keeps one figure per goal for the seven days ending on a given
+day. When the store's version moves, only the bars whose day changed get a
+new y value. Nothing else is rebuilt: the date labels, goal line and layout
+stay as they are. A new day rolls the window and rebuilds the figure.
+
+Sessions get a copy taken under the lock once per change, never the figure
+being patched. The figure's template keeps plotly's layout defaults, which
+Streamlit's theme restyles, and only the bar and scatter trace defaults, so
+the spec sent on every rerun is less than half the default size.
+"""
+import threading
+from datetime import date, timedelta
+from typing import List
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from task6_store import HydrationStore
+
+
+def _slim_template() -> go.layout.Template:
+    base = pio.templates["plotly"]
+    return go.layout.Template(layout=base.layout, data={"bar": base.data.bar, "scatter": base.data.scatter})
+
+
+def last_7_days(end: date) -> List[date]:
+    return [end - timedelta(days=i) for i in range(6, -1, -1)]
+
+
+class WeekChart:
+    def __init__(self, goal_ml: int):
+        self.goal_ml = int(goal_ml)
+        self.days: List[date] = []
+        self.ml = np.zeros(7, dtype=np.int64)
+        self.version = -1
+        self.fig = go.Figure()
+        self.view = go.Figure()  # read-only copy handed to sessions
+        self._lock = threading.Lock()
+
+    def _build(self):
+        labels = [d.strftime("%a %d") for d in self.days]
+        fig = go.Figure()
+        fig.add_bar(
+            x=labels,
+            y=self.ml / 1000,
+            name="Intake (L)",
+            hovertemplate="%{x}<br>%{y:.2f} L<extra></extra>"
+        )
+        fig.add_trace(go.Scatter(
+            x=labels,
+            y=[self.goal_ml / 1000] * len(labels),
+            mode="lines",
+            name="Daily Goal",
+            line=dict(dash="dash", width=2),
+            hovertemplate="Goal: %{y:.2f} L<extra></extra>"
+        ))
+        fig.update_layout(
+            yaxis_title="Liters",
+            xaxis_title="Day",
+            bargap=0.2,
+            hovermode="x unified",
+            height=380,
+            margin=dict(l=10, r=10, t=10, b=10),
+            template=_slim_template(),
+        )
+        self.fig = fig
+
+    def sync(self, store: HydrationStore, today: date) -> go.Figure:
+        """The figure for the week ending ``today``, patched up to the store's current version.
+
+        Returns the shared read-only copy; it is replaced, not changed, on the next patch.
+        """
+        with self._lock:
+            days = last_7_days(today)
+            if days != self.days:
+                self.days = days
+                self.ml = store.series(days[0], days[-1]).astype(np.int64)
+                self._build()
+                self.view = go.Figure(self.fig)
+            elif store.version != self.version:
+                new = store.series(days[0], days[-1]).astype(np.int64)
+                changed = np.flatnonzero(new != self.ml)
+                if len(changed):
+                    y = np.array(self.fig.data[0].y, dtype=float)
+                    y[changed] = new[changed] / 1000
+                    self.fig.data[0].y = y
+                    self.ml = new
+                    self.view = go.Figure(self.fig)
+            self.version = store.version
+            return self.view
@@ -0,0 +1,84 @@
+# task6_import.py
+"""Streaming CSV restore for the water tracker (task6.py).
+
+Backups are read in chunks. Each chunk's dates are parsed in one vectorized
+call and its ml are summed per day with ``np.bincount`` into a day-number
+array the size of the store. So memory is bounded by the chunk size plus
+that one array, however many intake events the file holds. When the file
+is read, the touched days are written to the store with a single bulk
+``set_totals``. Like the old restore, a day in the file replaces that
+day's total.
+"""
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from import_report import ImportReport as BaseReport
+from task6_store import EPOCH, MAX_DAY_ML, N_DAYS, HydrationStore
+
+CHUNK_ROWS = 100_000
+REQUIRED_COLUMNS = ["date", "ml"]
+
+
+class ImportReport(BaseReport):
+    def __init__(self):
+        super().__init__()
+        self.days = 0  # days whose total changed
+
+
+def _parse_dates(col: pd.Series) -> pd.Series:
+    """ISO dates (what the export writes) in one fast pass; anything else falls back to inference."""
+    parsed = pd.to_datetime(col, errors="coerce", format="ISO8601")
+    retry = parsed.isna() & (col.str.strip() != "")
+    if retry.any():
+        parsed[retry] = pd.to_datetime(col[retry], errors="coerce", format="mixed")
+    return parsed
+
+
+def restore_log(
+    store: HydrationStore,
+    source,
+    chunk_rows: int = CHUNK_ROWS,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> ImportReport:
+    """Stream ``source`` (path or file-like CSV with date, ml columns) into ``store``."""
+    report = ImportReport()
+    totals = np.zeros(N_DAYS, dtype=np.int64)
+    seen_days = np.zeros(N_DAYS, dtype=bool)
+    epoch = np.datetime64(EPOCH, "D")
+    seen = 0
+
+    for chunk in pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False):
+        missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"CSV needs columns: {', '.join(REQUIRED_COLUMNS)} (missing {', '.join(missing)}).")
+        lines = np.arange(seen, seen + len(chunk)) + 2  # 1-based, after the header line
+        seen += len(chunk)
+
+        dates = _parse_dates(chunk["date"])
+        day = (dates.to_numpy("datetime64[D]") - epoch).astype(np.int64)
+        ml = pd.to_numeric(chunk["ml"].str.replace(",", "", regex=False).str.strip(), errors="coerce")
+        no_date = dates.isna().to_numpy()
+        reason = np.select(
+            [no_date, ~no_date & ((day < 0) | (day >= N_DAYS)), ml.isna().to_numpy(), (ml < 0).to_numpy(),
+             (ml > MAX_DAY_ML).to_numpy()],
+            ["Date is not valid.", "Date is outside the tracked years.", "ml is not a number.", "ml cannot be negative.",
+             f"ml is over {MAX_DAY_ML:,}."],
+            default="",
+        )
+        bad = reason != ""
+        if bad.any():
+            report.reject(lines[bad], reason[bad], chunk.loc[bad, REQUIRED_COLUMNS])
+        ok = ~bad
+        if ok.any():
+            day_ok = day[ok]
+            totals += np.bincount(day_ok, weights=np.rint(ml.to_numpy()[ok]), minlength=N_DAYS).astype(np.int64)
+            seen_days[day_ok] = True
+            report.imported += int(ok.sum())
+        if on_progress is not None:
+            on_progress(seen)
+
+    days = np.flatnonzero(seen_days)
+    report.days = store.set_totals(days, totals[days])
+    return report
@@ -0,0 +1,108 @@
+# task6_stats.py
+"""Range analytics over the hydration store's daily totals (task6.py).
+
+Built once per (data version, goal):
+
+* prefix sums of ml and of goal-met days, so any range's total, average or
+  met-day count is two lookups;
+* a run-length index of goal-met days: sorted run starts and ends, plus a
+  sparse table of run lengths. The current streak is one binary search.
+  The longest streak inside a range clips the two boundary runs and takes
+  an O(1) range-max over the runs in between.
+
+Days are day numbers as in ``task6_store`` (0 = ``EPOCH``).
+"""
+from datetime import date
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from task6_store import day_date, day_number
+
+
+class HydrationStats:
+    def __init__(self, daily: np.ndarray, goal_ml: int):
+        daily = np.asarray(daily, dtype=np.int64)
+        self.goal_ml = int(goal_ml)
+        self.daily = daily.copy()  # the store's array is memory-mapped and changes in place
+        self.cum_ml = np.concatenate(([0], np.cumsum(daily)))
+        met = daily >= self.goal_ml
+        self.cum_met = np.concatenate(([0], np.cumsum(met)))
+        logged = np.flatnonzero(daily)
+        self.first_day: Optional[date] = day_date(logged[0]) if len(logged) else None
+
+        edges = np.diff(np.concatenate(([0], met.astype(np.int8), [0])))
+        self.run_starts = np.flatnonzero(edges == 1)
+        self.run_ends = np.flatnonzero(edges == -1) - 1  # inclusive
+        lengths = self.run_ends - self.run_starts + 1
+        # sparse table: level k holds max length over runs [i, i + 2**k)
+        self._table = [lengths]
+        k = 1
+        while (1 << k) <= len(lengths):
+            prev = self._table[-1]
+            half = 1 << (k - 1)
+            self._table.append(np.maximum(prev[:-half], prev[half:]))
+            k += 1
+
+    # ---------- range sums ----------
+    def _span(self, start: date, end: date) -> Tuple[int, int]:
+        return day_number(start), day_number(end) + 1
+
+    def total(self, start: date, end: date) -> int:
+        a, b = self._span(start, end)
+        return int(self.cum_ml[b] - self.cum_ml[a])
+
+    def average(self, start: date, end: date) -> float:
+        a, b = self._span(start, end)
+        return (self.cum_ml[b] - self.cum_ml[a]) / max(b - a, 1)
+
+    def days_met(self, start: date, end: date) -> int:
+        a, b = self._span(start, end)
+        return int(self.cum_met[b] - self.cum_met[a])
+
+    # ---------- streaks ----------
+    def _run_max(self, i: int, j: int) -> int:
+        """Longest run among runs i..j-1 (0 when empty)."""
+        if j <= i:
+            return 0
+        k = (j - i).bit_length() - 1
+        level = self._table[k]
+        return int(max(level[i], level[j - (1 << k)]))
+
+    def current_streak(self, day: date) -> int:
+        """Goal-met days in a row ending on ``day``; 0 if ``day`` itself missed."""
+        d = day_number(day)
+        i = int(np.searchsorted(self.run_starts, d, side="right")) - 1
+        if i < 0 or self.run_ends[i] < d:
+            return 0
+        return d - int(self.run_starts[i]) + 1
+
+    def longest_streak(self, start: date, end: date) -> int:
+        """Longest run of goal-met days inside [start, end]."""
+        a, b = day_number(start), day_number(end)
+        lo = int(np.searchsorted(self.run_ends, a, side="left"))     # first run ending on/after a
+        hi = int(np.searchsorted(self.run_starts, b, side="right"))  # runs starting on/before b
+        if hi <= lo:
+            return 0
+        best = max(self._clipped(lo, a, b), self._clipped(hi - 1, a, b))
+        return max(best, self._run_max(lo + 1, hi - 1))
+
+    def _clipped(self, i: int, a: int, b: int) -> int:
+        return int(min(self.run_ends[i], b) - max(self.run_starts[i], a) + 1)
+
+    # ---------- views ----------
+    def series(self, start: date, end: date) -> pd.Series:
+        """Daily ml over [start, end], indexed by date."""
+        a, b = self._span(start, end)
+        return pd.Series(self.daily[a:b], index=pd.date_range(start, end, freq="D"), name="ml")
+
+    def year_grid(self, year: int) -> pd.DataFrame:
+        """Weekday (rows, Mon..Sun) × week-of-year (columns) litres for a calendar heatmap; NaN outside the year."""
+        days = self.series(date(year, 1, 1), date(year, 12, 31))
+        pad = days.index[0].weekday()
+        cells = np.full(pad + len(days), np.nan)
+        cells[pad:] = days.to_numpy() / 1000
+        cells = np.concatenate((cells, np.full(-len(cells) % 7, np.nan)))
+        grid = cells.reshape(-1, 7).T
+        return pd.DataFrame(grid, index=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"])
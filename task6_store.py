@@ -0,0 +1,165 @@
+# task6_store.py
+"""Persistent hydration history for the water tracker (task6.py).
+
+Daily totals live in one int32 array indexed by day number (days since
+``EPOCH``). The array is a memory-mapped ``.npy``, so opening the app maps
+a ~150 KB file instead of parsing a log, and adding water writes one cell.
+Every intake is also appended to ``events.csv`` (time, date, ml, kind),
+which is the source of truth. ``meta.json`` records how many bytes of the
+log are already in the array and is marked dirty while a write is in
+progress, so a crash part-way through is rebuilt from the log on the next
+open rather than replayed on top of a half-updated array.
+
+A day's total is kept within 0..``MAX_DAY_ML``; writes that would leave
+that range raise ValueError, so the int32 cells can never wrap around.
+"""
+import io
+import json
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = Path("hydration")
+DAILY_FILE = "daily.npy"
+EVENTS_FILE = "events.csv"
+META_FILE = "meta.json"
+EVENT_COLUMNS = ["ts", "date", "ml", "kind"]
+EPOCH = date(2000, 1, 1)
+N_DAYS = (date(2100, 1, 1) - EPOCH).days  # 2000-01-01 .. 2099-12-31
+MAX_DAY_ML = 100_000  # 100 L; no real day comes close, and it is far inside int32
+
+
+def day_number(d: date) -> int:
+    n = (d - EPOCH).days
+    if not 0 <= n < N_DAYS:
+        raise ValueError(f"{d.isoformat()} is outside the tracked years ({EPOCH.year}–2099).")
+    return n
+
+
+def day_date(n: int) -> date:
+    return EPOCH + timedelta(days=int(n))
+
+
+def check_totals(totals: np.ndarray):
+    bad = (totals < 0) | (totals > MAX_DAY_ML)
+    if bad.any():
+        raise ValueError(f"{int(bad.sum())} day total(s) outside 0–{MAX_DAY_ML:,} ml.")
+
+
+class HydrationStore:
+    """One instance per process (task6.py caches it); a lock orders writers."""
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.version = 0  # bumped on every change, for caches keyed by data version
+        events = self.root / EVENTS_FILE
+        if not events.exists():
+            events.write_text(",".join(EVENT_COLUMNS) + "\n", encoding="utf-8")
+        path = self.root / DAILY_FILE
+        if not path.exists():
+            np.lib.format.open_memmap(path, mode="w+", dtype=np.int32, shape=(N_DAYS,)).flush()
+            self._write_meta(0)
+        self.daily = np.lib.format.open_memmap(path, mode="r+")
+        self._catch_up()
+
+    # ---------- consistency ----------
+    def _read_meta(self) -> Tuple[int, bool]:
+        meta = self.root / META_FILE
+        if not meta.exists():
+            return 0, False
+        m = json.loads(meta.read_text())
+        return m["applied_bytes"], m.get("dirty", False)
+
+    def _write_meta(self, applied: int, dirty: bool = False):
+        tmp = self.root / (META_FILE + ".tmp")
+        tmp.write_text(json.dumps({"applied_bytes": applied, "dirty": dirty}))
+        tmp.replace(self.root / META_FILE)
+
+    def _catch_up(self):
+        """Fold in events logged after the array was last written, or rebuild from the
+        whole log if it shrank or a write was interrupted."""
+        size = (self.root / EVENTS_FILE).stat().st_size
+        applied, dirty = self._read_meta()
+        if applied == size and not dirty:
+            return
+        if dirty or applied > size or applied == 0:
+            self.daily[:] = 0
+            applied = 0
+        with open(self.root / EVENTS_FILE, "rb") as f:
+            header = f.readline()
+            f.seek(max(applied, len(header)))
+            tail = f.read()
+        if tail.strip():
+            ev = pd.read_csv(io.BytesIO(header + tail), usecols=["date", "ml"])
+            days = (pd.to_datetime(ev["date"]).to_numpy("datetime64[D]") - np.datetime64(EPOCH, "D")).astype(np.int64)
+            np.add.at(self.daily, days, ev["ml"].to_numpy(dtype=np.int64))
+        self.daily.flush()
+        self._write_meta(size)
+
+    # ---------- writing ----------
+    def _log(self, days: np.ndarray, deltas: np.ndarray, kind: str):
+        """Append one event per (day number, ml delta) and add the deltas to the array.
+
+        meta.json is marked dirty before either write and clean after both, so
+        an interrupted write is never replayed on top of its own array change.
+        """
+        self._write_meta(self._read_meta()[0], dirty=True)
+        now = datetime.now().isoformat(timespec="seconds")
+        iso = (np.datetime64(EPOCH, "D") + days).astype(str)
+        lines = "".join(f"{now},{d},{int(ml)},{kind}\n" for d, ml in zip(iso.tolist(), deltas.tolist()))
+        with open(self.root / EVENTS_FILE, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            size = f.tell()
+        np.add.at(self.daily, days, deltas)
+        self.daily.flush()
+        self._write_meta(size)
+        self.version += 1
+
+    def add(self, d: date, ml: int) -> int:
+        """Log one intake; returns the day's new total."""
+        with self._lock:
+            n = day_number(d)
+            check_totals(np.array([int(self.daily[n]) + int(ml)]))
+            self._log(np.array([n]), np.array([int(ml)]), "add")
+            return int(self.daily[n])
+
+    def set_total(self, d: date, ml: int = 0):
+        """Set a day's total (e.g. "Reset today's intake"), logged as a correcting event."""
+        self.set_totals(np.array([day_number(d)]), np.array([ml]))
+
+    def set_totals(self, days: np.ndarray, totals: np.ndarray) -> int:
+        """Set many days (by day number) at once, e.g. restoring a backup: one log append, one flush.
+
+        Returns how many days changed.
+        """
+        days = np.asarray(days, dtype=np.int64)
+        totals = np.asarray(totals, dtype=np.int64)
+        check_totals(totals)
+        with self._lock:
+            delta = totals - self.daily[days]
+            changed = delta != 0
+            if not changed.any():
+                return 0
+            self._log(days[changed], delta[changed], "set")
+            return int(changed.sum())
+
+    # ---------- reading ----------
+    def total(self, d: date) -> int:
+        return int(self.daily[day_number(d)])
+
+    def series(self, start: date, end: date) -> np.ndarray:
+        """Daily totals from ``start`` to ``end`` inclusive (a copy)."""
+        return np.array(self.daily[day_number(start):day_number(end) + 1])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Days with any intake, as (date, ml) for export."""
+        days = np.flatnonzero(self.daily)
+        dates = (np.datetime64(EPOCH, "D") + days).astype("datetime64[D]").astype(str)
+        return pd.DataFrame({"date": dates, "ml": np.asarray(self.daily[days], dtype=np.int64)})
@@ -1,40 +1,72 @@
 import streamlit as st
 import pandas as pd
 from datetime import date, datetime
-from pathlib import Path
 
-st.set_page_config(page_title="Gym Workout Logger 🏋️", page_icon="🏋️", layout="wide")
+from task7_catalog import ALIASES_FILE, ExerciseCatalog, load_aliases, save_aliases
+from task7_charts import DEFAULT_TOP_N, MAX_POINTS, MAX_TOP_N, by_exercise_chart, overall_chart
+from task7_diff import diff_edits, rename_rows
+from task7_index import WorkoutIndex
+from task7_records import FORMULAS, ROLLING_DAYS, RecordBook
+from task7_store import ROW_ID, WorkoutStore, empty_frame
 
-DATA_FILE = Path("workouts.csv")
+st.set_page_config(page_title="Gym Workout Logger 🏋️", page_icon="🏋️", layout="wide")
 
 # ---------- Utilities ----------
+@st.cache_resource
+def get_store() -> WorkoutStore:
+    """One store per process: appends, loads and compaction share its lock."""
+    return WorkoutStore()
+
 def load_data() -> pd.DataFrame:
-    if DATA_FILE.exists():
-        df = pd.read_csv(DATA_FILE)
-        # Ensure dtypes
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"]).dt.date
-        expected = ["date", "exercise", "sets", "reps", "weight_kg", "volume"]
-        for col in expected:
-            if col not in df.columns:
-                df[col] = pd.Series(dtype="object")
-        # clean types
-        df["sets"] = pd.to_numeric(df["sets"], errors="coerce").fillna(0).astype(int)
-        df["reps"] = pd.to_numeric(df["reps"], errors="coerce").fillna(0).astype(int)
-        df["weight_kg"] = pd.to_numeric(df["weight_kg"], errors="coerce").fillna(0.0)
-        df["volume"] = pd.to_numeric(df["volume"], errors="coerce").fillna(0.0)
-        return df[["date", "exercise", "sets", "reps", "weight_kg", "volume"]]
-    else:
-        return pd.DataFrame(columns=["date", "exercise", "sets", "reps", "weight_kg", "volume"])
+    """The process-wide snapshot: parsed once per file version, shared read-only by every session."""
+    st.session_state.df_version, df = get_store().snapshot()
+    return df
 
 def save_data(df: pd.DataFrame):
-    df_to_save = df.copy()
-    df_to_save["date"] = pd.to_datetime(df_to_save["date"]).dt.strftime("%Y-%m-%d")
-    df_to_save.to_csv(DATA_FILE, index=False)
+    get_store().rewrite(df)
 
 def ensure_state():
-    if "df" not in st.session_state:
-        st.session_state.df = load_data()
+    # Point at the current shared snapshot on every run; sessions hold no private copy.
+    # Writes go through the store, which swaps in a new frame (copy-on-write).
+    st.session_state.df = load_data()
+
+@st.cache_resource(max_entries=4)
+def shared_index(version: int, _df: pd.DataFrame) -> WorkoutIndex:
+    return WorkoutIndex(_df)
+
+def get_index() -> WorkoutIndex:
+    """Date/exercise indexes for the snapshot, built once per data version for all sessions."""
+    return shared_index(st.session_state.df_version, st.session_state.df)
+
+@st.cache_resource
+def record_book(formula: str) -> RecordBook:
+    return RecordBook(formula)
+
+def get_records(formula: str) -> RecordBook:
+    """PR analytics synced to the snapshot; a single logged entry is scored incrementally."""
+    book = record_book(formula)
+    book.sync(st.session_state.df_version, st.session_state.df, get_store().last_append)
+    return book
+
+@st.cache_resource
+def exercise_catalog() -> ExerciseCatalog:
+    return ExerciseCatalog(load_aliases(get_store().root / ALIASES_FILE))
+
+def get_catalog() -> ExerciseCatalog:
+    """Normalized exercise names: the one list behind the sidebar picker and the filter."""
+    catalog = exercise_catalog()
+    catalog.sync(st.session_state.df_version, st.session_state.df, get_store().last_append)
+    return catalog
+
+def rename_exercise(names, new_name: str) -> int:
+    diff = rename_rows(st.session_state.df, names, new_name)
+    if diff:
+        get_store().apply(diff)
+        ensure_state()
+    return len(diff.after)
+
+def use_suggestion(name: str):
+    st.session_state.new_exercise = name
 
 ensure_state()
 
@@ -43,12 +75,17 @@ with st.sidebar:
     st.header("➕ Log Workout")
     log_date = st.date_input("Date", value=date.today())
     # Suggest last used exercises
-    existing_exercises = sorted(st.session_state.df["exercise"].dropna().unique().tolist())
+    existing_exercises = get_catalog().names()
     exercise_mode = st.radio("Exercise input", ["Pick from list", "Type new"], horizontal=True)
     if exercise_mode == "Pick from list" and existing_exercises:
         exercise = st.selectbox("Exercise", existing_exercises, index=0)
     else:
-        exercise = st.text_input("Exercise", placeholder="e.g., Bench Press")
+        exercise = st.text_input("Exercise", placeholder="e.g., Bench Press", key="new_exercise")
+        suggestions = [s for s in get_catalog().suggest(exercise) if s != exercise] if exercise.strip() else []
+        if suggestions:
+            st.caption("Did you mean:")
+            for i, name in enumerate(suggestions):
+                st.button(name, key=f"suggest_{i}", on_click=use_suggestion, args=(name,))
 
     colA, colB, colC = st.columns(3)
     with colA:
@@ -65,18 +102,37 @@ with st.sidebar:
             st.warning("Please enter an exercise name.")
         else:
             volume = sets * reps * float(weight)
+            exercise = get_catalog().resolve(exercise)  # "bench press " logs as the existing "Bench Press"
             new_row = {
                 "date": log_date,
-                "exercise": exercise.strip(),
+                "exercise": exercise,
                 "sets": int(sets),
                 "reps": int(reps),
                 "weight_kg": float(weight),
                 "volume": float(volume),
             }
-            st.session_state.df = pd.concat([st.session_state.df, pd.DataFrame([new_row])], ignore_index=True)
-            save_data(st.session_state.df)
+            get_store().append([new_row])
+            ensure_state()
             st.success(f"Logged: {exercise} — {sets}×{reps} @ {weight}kg (Volume: {int(volume)})")
 
+    with st.expander("🔗 Exercise names"):
+        duplicates = get_catalog().duplicates()
+        if duplicates:
+            st.caption("Logged under several spellings: " + "; ".join(f"{k} ({len(v)})" for k, v in duplicates.items()))
+            if st.button("Merge spellings", use_container_width=True):
+                merged = sum(rename_exercise(v, k) for k, v in duplicates.items())
+                st.success(f"Merged {merged} entries.")
+        with st.form("alias_form", clear_on_submit=True):
+            alias = st.text_input("Alias", placeholder="e.g., BP")
+            target = st.selectbox("Means", get_catalog().names() or [""])
+            if st.form_submit_button("Add alias", use_container_width=True) and alias.strip() and target:
+                catalog = get_catalog()
+                old_names = catalog.variants(alias)
+                catalog.set_alias(alias, target)
+                save_aliases(get_store().root / ALIASES_FILE, catalog.aliases)
+                moved = rename_exercise(old_names, target)
+                st.success(f"“{alias.strip()}” now means {target}" + (f"; {moved} entries renamed." if moved else "."))
+
 # ---------- Main: History & Analytics ----------
 st.title("Gym Workout Logger 🏋️")
 st.caption("Log exercises (sets, reps, weight), view history, and track weekly progress.")
@@ -85,11 +141,11 @@ st.caption("Log exercises (sets, reps, weight), view history, and track weekly p
 with st.expander("🔎 Filters", expanded=False):
     col1, col2, col3 = st.columns([1,1,2])
     with col1:
-        unique_ex = ["All"] + sorted(st.session_state.df["exercise"].dropna().unique().tolist())
+        unique_ex = ["All"] + get_catalog().names()
         selected_ex = st.selectbox("Exercise", unique_ex, index=0)
     with col2:
-        min_date = st.session_state.df["date"].min() if not st.session_state.df.empty else None
-        max_date = st.session_state.df["date"].max() if not st.session_state.df.empty else None
+        min_date = get_index().min_date
+        max_date = get_index().max_date
         date_range = st.date_input(
             "Date range",
             value=(min_date or date.today(), max_date or date.today()),
@@ -98,18 +154,17 @@ with st.expander("🔎 Filters", expanded=False):
         st.markdown("Use filters to narrow your view. Weekly chart updates automatically.")
 
 # Apply filters
-df = st.session_state.df.copy()
+df = st.session_state.df
 if not df.empty:
     # Normalize date_range value
     if isinstance(date_range, tuple) and len(date_range) == 2:
         start_d, end_d = date_range
     else:
-        start_d, end_d = (df["date"].min(), df["date"].max())
+        start_d, end_d = (get_index().min_date, get_index().max_date)
 
-    mask = (pd.to_datetime(df["date"]) >= pd.to_datetime(start_d)) & (pd.to_datetime(df["date"]) <= pd.to_datetime(end_d))
-    if selected_ex != "All":
-        mask = mask & (df["exercise"] == selected_ex)
-    df_filtered = df.loc[mask].sort_values("date", ascending=False)
+    # Binary search on the date index, positions lookup for the exercise; newest first
+    filtered_labels = get_index().select(start_d, end_d, None if selected_ex == "All" else get_catalog().variants(selected_ex))
+    df_filtered = df.loc[filtered_labels]
 else:
     df_filtered = df
 
@@ -119,10 +174,12 @@ if df_filtered.empty:
     st.info("No entries yet. Add your first workout from the sidebar!")
 else:
     edited = st.data_editor(
-        df_filtered.reset_index(drop=True),
+        df_filtered.reset_index().astype({"exercise": str}),
         use_container_width=True,
+        hide_index=True,
         num_rows="dynamic",
         column_config={
+            ROW_ID: None,  # hidden; rows added in the editor come back without one
             "date": st.column_config.DateColumn("date", format="YYYY-MM-DD"),
             "exercise": st.column_config.TextColumn("exercise"),
             "sets": st.column_config.NumberColumn("sets", min_value=0, step=1),
@@ -134,24 +191,27 @@ else:
     )
 
     # Recompute volume if any inputs changed
-    edited["volume"] = (edited["sets"].astype(int) * edited["reps"].astype(int) * edited["weight_kg"].astype(float))
+    edited["volume"] = (
+        pd.to_numeric(edited["sets"], errors="coerce").fillna(0).astype(int)
+        * pd.to_numeric(edited["reps"], errors="coerce").fillna(0).astype(int)
+        * pd.to_numeric(edited["weight_kg"], errors="coerce").fillna(0.0)
+    )
 
     col_save, col_dl, col_clear = st.columns([1,1,1])
     with col_save:
         if st.button("💾 Save Changes", use_container_width=True):
-            # Merge edits back into full df (respect filters)
-            # We replace the filtered slice with edited rows by matching on original indices after sorting
-            # Easiest safe route: recompute full df using unfiltered + edited based on current mask
-            full = st.session_state.df.copy()
-            full_mask = (pd.to_datetime(full["date"]) >= pd.to_datetime(start_d)) & (pd.to_datetime(full["date"]) <= pd.to_datetime(end_d))
-            if selected_ex != "All":
-                full_mask = full_mask & (full["exercise"] == selected_ex)
-            # Replace rows under full_mask with edited (align columns)
-            full_subset = edited[["date","exercise","sets","reps","weight_kg","volume"]].copy()
-            full.loc[full_mask, ["date","exercise","sets","reps","weight_kg","volume"]] = full_subset.values
-            st.session_state.df = full
-            save_data(st.session_state.df)
-            st.success("Saved!")
+            # Persist only what changed, matched by row id
+            diff = diff_edits(df_filtered, edited, get_catalog().resolve)
+            if diff:
+                try:
+                    get_store().apply(diff)
+                except ValueError as e:  # e.g. a cleared date cell
+                    st.error(f"Not saved: {e}")
+                else:
+                    ensure_state()
+                    st.success(f"Saved! ({diff.summary()})")
+            else:
+                st.info("No changes to save.")
     with col_dl:
         st.download_button(
             "⬇️ Download CSV",
@@ -162,8 +222,8 @@ else:
         )
     with col_clear:
         if st.button("🗑️ Clear All (danger)", type="secondary", use_container_width=True):
-            st.session_state.df = pd.DataFrame(columns=["date", "exercise", "sets", "reps", "weight_kg", "volume"])
-            save_data(st.session_state.df)
+            save_data(empty_frame())
+            ensure_state()
             st.warning("All logs cleared.")
 
 # ---------- Weekly Progress (Training Volume) ----------
@@ -171,20 +231,46 @@ st.subheader("📈 Weekly Progress (Total Volume)")
 if st.session_state.df.empty:
     st.info("No data yet to plot. Log some workouts!")
 else:
-    df_plot = st.session_state.df.copy()
-    df_plot["date"] = pd.to_datetime(df_plot["date"])
-    df_plot["week"] = df_plot["date"] - pd.to_timedelta(df_plot["date"].dt.weekday, unit="D")  # start of week (Mon)
+    # Read the persisted (week, exercise) rollup instead of regrouping the history
+    weekly = get_store().weekly_volume()
 
-    # Option to group by exercise or overall
+    # Option to group by exercise or overall; each series is LTTB-downsampled to a fixed size
     grp_mode = st.radio("Group by", ["Overall", "By Exercise"], horizontal=True)
     if grp_mode == "Overall":
-        weekly = df_plot.groupby("week", as_index=False)["volume"].sum().rename(columns={"volume": "total_volume"})
-        st.line_chart(weekly.set_index("week")["total_volume"])
+        st.line_chart(overall_chart(weekly))
     else:
-        weekly = df_plot.groupby(["week", "exercise"], as_index=False)["volume"].sum()
-        # Pivot for multi-line chart
-        pivoted = weekly.pivot(index="week", columns="exercise", values="volume").fillna(0)
-        st.line_chart(pivoted)
+        n_exercises = weekly["exercise"].nunique()
+        top_n = 1
+        if n_exercises > 1:
+            top_n = st.slider("Top exercises by volume", 1, min(MAX_TOP_N, n_exercises), min(DEFAULT_TOP_N, n_exercises))
+        st.line_chart(by_exercise_chart(weekly, top_n), x="week", y="volume", color="exercise")
+    st.caption(f"Long histories are downsampled to {MAX_POINTS} points per line.")
+
+# ---------- Personal Records (estimated 1RM) ----------
+st.subheader("🏆 Personal Records")
+if st.session_state.df.empty:
+    st.info("Log some workouts to see your records.")
+else:
+    formula = st.radio("1RM formula", list(FORMULAS), horizontal=True, help="Estimated one-rep max from weight × reps")
+    book = get_records(formula)
+    st.dataframe(
+        book.summary(),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "best_e1rm": st.column_config.NumberColumn("best e1RM (kg)", format="%.1f"),
+            "heaviest_kg": st.column_config.NumberColumn("heaviest (kg)"),
+            "prs": st.column_config.NumberColumn("all-time PRs"),
+            "rolling_prs": st.column_config.NumberColumn(f"{ROLLING_DAYS}-day PRs"),
+        },
+    )
+    col_trend, col_recent = st.columns([3, 2])
+    with col_trend:
+        trend_ex = st.selectbox("e1RM trend for", get_index().exercises, key="trend_exercise")
+        st.line_chart(book.trend(trend_ex))
+    with col_recent:
+        st.markdown("**Recent PRs**")
+        st.dataframe(book.recent_prs(), use_container_width=True, hide_index=True)
 
 # ---------- Tips ----------
 with st.expander("💡 Tips"):
@@ -192,6 +278,7 @@ with st.expander("💡 Tips"):
         """
 - **Volume** = sets × reps × weight. Higher weekly volume typically indicates progress for hypertrophy.
 - Use filters to inspect specific exercises and see how volume trends over time.
+- **e1RM** estimates your one-rep max from a set (Epley: w × (1 + reps/30), Brzycki: w × 36/(37 − reps)). An all-time PR beats every earlier set of that exercise.
 - Download your CSV for backup or analysis elsewhere.
 """
     )
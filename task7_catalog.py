@@ -0,0 +1,184 @@
+# task7_catalog.py
+"""Exercise catalog for the gym logger: normalized names in a prefix trie.
+
+Names are keyed by a normalized form: case-folded, whitespace collapsed,
+and separators like "-" or "_" read as spaces. So "Bench Press",
+"bench press " and "Bench-Press" are one exercise. That key shows under
+its most-logged spelling. User aliases ("BP" -> "Bench Press") map one key
+onto another and persist next to the store.
+
+Keys live in a trie for suggestions, under every word start, so "press"
+finds "Bench Press". Exact prefixes come first, then typo-tolerant ones.
+An edit-distance DP row (with adjacent transpositions) is carried down the
+trie, and subtrees whose best cell already exceeds the allowed edits are
+pruned.
+"""
+import json
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+ALIASES_FILE = "aliases.json"
+MAX_SUGGESTIONS = 6
+_SEPARATORS = re.compile(r"[\s\-_./]+")
+
+
+def normalize_name(name) -> str:
+    return _SEPARATORS.sub(" ", str(name)).strip().casefold()
+
+
+def clean_name(name) -> str:
+    """What gets stored for a brand-new exercise: trimmed, inner whitespace collapsed."""
+    return re.sub(r"\s+", " ", str(name)).strip()
+
+
+def load_aliases(path: Path) -> Dict[str, str]:
+    path = Path(path)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def save_aliases(path: Path, aliases: Dict[str, str]):
+    tmp = Path(path).with_suffix(".tmp")
+    tmp.write_text(json.dumps(aliases, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+class _Node:
+    __slots__ = ("children", "keys")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.keys: Set[str] = set()  # names whose key (or one of its word suffixes) ends here
+
+
+class ExerciseCatalog:
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        self.aliases: Dict[str, str] = dict(aliases or {})
+        self.spellings: Dict[str, Counter] = {}   # key -> Counter of raw stored names
+        self.version = -1
+        self._root = _Node()
+        self._lock = threading.Lock()
+
+    # ---------- building ----------
+    def _canonical_key(self, name) -> str:
+        key = normalize_name(name)
+        return self.aliases.get(key, key)
+
+    def _insert(self, key: str):
+        starts = [0] + [i + 1 for i, ch in enumerate(key) if ch == " "]
+        for start in starts:
+            node = self._root
+            for ch in key[start:]:
+                node = node.children.setdefault(ch, _Node())
+            node.keys.add(key)
+
+    def add(self, name, count: int = 1):
+        """Record ``count`` entries logged under ``name``; O(len(name))."""
+        key = self._canonical_key(name)
+        if not key:
+            return
+        if key not in self.spellings:
+            self.spellings[key] = Counter()
+            self._insert(key)
+        self.spellings[key][str(name)] += count
+
+    def rebuild(self, exercise: pd.Series):
+        self.spellings = {}
+        self._root = _Node()
+        for name, n in exercise.value_counts().items():  # categorical: one count per category
+            if n:
+                self.add(name, int(n))
+
+    def sync(self, version: int, df: pd.DataFrame, last_append: Optional[Tuple[int, pd.DataFrame]] = None):
+        """Catch up with the store: add just the appended names when that is all that changed."""
+        with self._lock:
+            if version == self.version:
+                return
+            if last_append is not None and last_append[0] == version == self.version + 1:
+                for name in last_append[1]["exercise"]:
+                    self.add(name)
+            else:
+                self.rebuild(df["exercise"])
+            self.version = version
+
+    def set_alias(self, alias: str, target: str):
+        """Make ``alias`` resolve to ``target``'s exercise from now on."""
+        a, t = normalize_name(alias), self._canonical_key(target)
+        if a and a != t:
+            self.aliases = {k: (t if v == a else v) for k, v in self.aliases.items()}
+            self.aliases[a] = t
+
+    # ---------- reading ----------
+    def display(self, key: str) -> str:
+        """Most-logged spelling of a key."""
+        return self.spellings[key].most_common(1)[0][0]
+
+    def names(self) -> List[str]:
+        """One display name per exercise, sorted case-insensitively."""
+        return sorted((self.display(k) for k in self.spellings), key=str.casefold)
+
+    def resolve(self, name) -> str:
+        """The name a new entry should be stored under: an existing exercise's spelling if it matches."""
+        key = self._canonical_key(name)
+        return self.display(key) if key in self.spellings else clean_name(name)
+
+    def variants(self, name) -> List[str]:
+        """Every raw stored spelling of ``name``'s exercise."""
+        key = self._canonical_key(name)
+        return list(self.spellings.get(key, {}))
+
+    def duplicates(self) -> Dict[str, List[str]]:
+        """Display name -> stored spellings, for exercises logged under more than one."""
+        return {self.display(k): list(c) for k, c in self.spellings.items() if len(c) > 1}
+
+    def suggest(self, query: str, limit: int = MAX_SUGGESTIONS) -> List[str]:
+        """Prefix matches by popularity, then names within a few typos of the prefix."""
+        q = self._canonical_key(query)
+        if not q:
+            return []
+        found: Dict[str, int] = {}  # key -> edit distance
+        node = self._root
+        for ch in q:
+            node = node.children.get(ch)
+            if node is None:
+                break
+        else:
+            for key in self._subtree(node):
+                found[key] = 0
+        if len(found) < limit:
+            self._fuzzy(q, max(1, len(q) // 4), found)
+        popularity = {k: sum(self.spellings[k].values()) for k in found}
+        ranked = sorted(found, key=lambda k: (found[k], -popularity[k], k))
+        return [self.display(k) for k in ranked[:limit]]
+
+    def _subtree(self, node: _Node) -> List[str]:
+        out, stack = [], [node]
+        while stack:
+            n = stack.pop()
+            out.extend(n.keys)
+            stack.extend(n.children.values())
+        return out
+
+    def _fuzzy(self, q: str, max_edits: int, found: Dict[str, int]):
+        """Keys with a prefix within ``max_edits`` of ``q`` (fuzzy prefix search)."""
+        first = list(range(len(q) + 1))
+        # (node, its char, parent's char, parent's DP row, grandparent's DP row, best distance so far)
+        stack = [(child, ch, "", first, None, max_edits + 1) for ch, child in self._root.children.items()]
+        while stack:
+            node, ch, prev_ch, prev, prev2, best = stack.pop()
+            row = [prev[0] + 1]
+            for j in range(1, len(q) + 1):
+                cell = min(row[j - 1] + 1, prev[j] + 1, prev[j - 1] + (q[j - 1] != ch))
+                if prev2 is not None and j > 1 and q[j - 1] == prev_ch and q[j - 2] == ch:
+                    cell = min(cell, prev2[j - 2] + 1)  # adjacent transposition
+                row.append(cell)
+            best = min(best, row[-1])  # distance from q to the closest prefix on this path
+            for key in node.keys:
+                if best <= max_edits:
+                    found[key] = min(found.get(key, best), best)
+            if best <= max_edits or min(row) <= max_edits:
+                stack.extend((child, c, ch, row, prev, best) for c, child in node.children.items())
@@ -0,0 +1,75 @@
+# task7_charts.py
+"""Bounded-size chart data for task7's Weekly Progress section.
+
+Long histories are downsampled per series with Largest-Triangle-Three-Buckets
+(LTTB). LTTB keeps the first and last points, splits the rest into equal
+buckets, and from each bucket keeps the point forming the largest triangle
+with the previously kept point and the next bucket's average. Peaks and
+dips survive while the point count stays fixed. The per-exercise chart
+also shows only the top N exercises by total volume, so neither the
+payload nor the legend grows with the history.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 300   # per series sent to the browser
+DEFAULT_TOP_N = 5
+MAX_TOP_N = 20
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the ``n_out`` points LTTB keeps from (x, y); all indices when already small enough."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # bucket edges over the interior points 1..n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(series: pd.Series, max_points: int = MAX_POINTS) -> pd.Series:
+    """LTTB over a datetime-indexed series."""
+    if len(series) <= max_points:
+        return series
+    x = series.index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return series.iloc[lttb(x, series.to_numpy(dtype=float), max_points)]
+
+
+def top_exercises(weekly: pd.DataFrame, n: int) -> List[str]:
+    """Exercises with the most total volume in a (week, exercise, volume) table."""
+    totals = weekly.groupby("exercise")["volume"].sum()
+    return totals.nlargest(n).index.tolist()
+
+
+def overall_chart(weekly: pd.DataFrame, max_points: int = MAX_POINTS) -> pd.Series:
+    total = weekly.groupby("week")["volume"].sum().rename("total_volume")
+    return downsample(total, max_points)
+
+
+def by_exercise_chart(weekly: pd.DataFrame, n: int = DEFAULT_TOP_N, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """Long (week, exercise, volume) rows for the top ``n`` exercises, each downsampled."""
+    top = top_exercises(weekly, n)
+    wide = (
+        weekly[weekly["exercise"].isin(top)]
+        .pivot(index="week", columns="exercise", values="volume")
+        .fillna(0)  # weeks without an exercise plot as zero, like the full pivot did
+    )
+    parts = [downsample(wide[ex], max_points).rename("volume").reset_index().assign(exercise=ex) for ex in top]
+    if not parts:
+        return pd.DataFrame(columns=["week", "exercise", "volume"])
+    return pd.concat(parts, ignore_index=True)[["week", "exercise", "volume"]]
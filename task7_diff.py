@@ -0,0 +1,72 @@
+# task7_diff.py
+"""Diff between the workout history editor's output and the slice it was shown.
+
+Rows carry their stable ``id`` in a hidden editor column. Rows without one
+were added in the editor. Shown ids missing from the output were deleted.
+Rows whose values changed are updates. Only these rows reach the store,
+so a save costs O(changes), not O(history).
+"""
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from task7_store import COLUMNS, ROW_ID, normalize
+
+NUMERIC = ["sets", "reps", "weight_kg", "volume"]
+
+
+class EditDiff:
+    """Frames indexed by row id (``inserts`` gets its ids from the store)."""
+
+    def __init__(self, inserts: pd.DataFrame, before: pd.DataFrame, after: pd.DataFrame, deleted: pd.DataFrame):
+        self.inserts = inserts
+        self.before = before
+        self.after = after
+        self.deleted = deleted
+
+    def __bool__(self) -> bool:
+        return bool(len(self.inserts) or len(self.after) or len(self.deleted))
+
+    def removed_ids(self) -> pd.Index:
+        """Ids whose current version goes away: deleted rows and the old side of updates."""
+        return self.deleted.index.union(self.before.index)
+
+    def summary(self) -> str:
+        return f"{len(self.inserts)} added, {len(self.after)} updated, {len(self.deleted)} deleted"
+
+
+def diff_edits(original: pd.DataFrame, edited: pd.DataFrame, resolve: Optional[Callable[[str], str]] = None) -> EditDiff:
+    """Compare ``original`` (indexed by id) with the editor output (ids in an ``id`` column).
+
+    ``resolve`` maps typed exercise names onto the catalog's spelling before comparing.
+    """
+    if resolve is not None:
+        typed = edited["exercise"].notna() & (edited["exercise"].astype(str).str.strip() != "")
+        edited = edited.assign(exercise=edited["exercise"].where(~typed, edited["exercise"].astype(str).map(resolve)))
+    ids = pd.to_numeric(edited[ROW_ID], errors="coerce")
+    known = ids.isin(original.index).to_numpy()
+
+    new = edited.loc[~known]
+    new = new[new["exercise"].fillna("").astype(str).str.strip() != ""]  # blank added rows are ignored
+    inserts = normalize(new[COLUMNS]).reset_index(drop=True)
+
+    kept = normalize(edited.loc[known, COLUMNS])
+    kept.index = pd.Index(ids[known].astype(np.int64).to_numpy(), name=ROW_ID)
+    kept = kept[~kept.index.duplicated(keep="last")]
+    deleted = original.loc[original.index.difference(kept.index)]
+
+    old = normalize(original.loc[kept.index])
+    same_text = (old["date"] == kept["date"]).to_numpy() & (
+        old["exercise"].astype(str).to_numpy() == kept["exercise"].astype(str).to_numpy()
+    )
+    same_num = np.isclose(old[NUMERIC].to_numpy(dtype=float), kept[NUMERIC].to_numpy(dtype=float)).all(axis=1)
+    same = same_text & same_num
+    return EditDiff(inserts, original.loc[kept.index[~same]], kept[~same], deleted)
+
+
+def rename_rows(df: pd.DataFrame, names: Sequence[str], new_name: str) -> EditDiff:
+    """Updates that store every row logged under one of ``names`` as ``new_name``."""
+    rows = df[df["exercise"].isin(list(names)) & (df["exercise"] != new_name)]
+    nothing = df.iloc[:0][COLUMNS]
+    return EditDiff(nothing.reset_index(drop=True), rows[COLUMNS], rows[COLUMNS].assign(exercise=new_name), nothing)
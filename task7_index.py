@@ -0,0 +1,57 @@
+# task7_index.py
+"""In-memory indexes over the workout history for task7's filters.
+
+``WorkoutIndex`` keeps the rows' dates as a sorted datetime64[D] array and
+the exercise column as categorical codes. For each exercise it stores the
+row positions in date order. A date range is then two binary searches,
+and an exercise filter is a dict lookup plus two more binary searches
+inside that exercise's positions, with no full-column scans.
+"""
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+class WorkoutIndex:
+    def __init__(self, df: pd.DataFrame):
+        days = pd.to_datetime(df["date"]).to_numpy("datetime64[D]")
+        self.order = np.argsort(days, kind="stable")          # positions in date order
+        self.days = days[self.order]
+        self.labels = df.index.to_numpy()[self.order]         # df index labels in date order
+        exercise = pd.Categorical(df["exercise"].to_numpy()[self.order])  # NaN -> code -1, no category
+        self.exercises: List[str] = list(exercise.categories)
+        codes = exercise.codes
+        by_code = np.argsort(codes, kind="stable")            # stays date-ordered within a code
+        bounds = np.searchsorted(codes[by_code], np.arange(len(self.exercises) + 1))
+        self.positions: Dict[str, np.ndarray] = {
+            ex: by_code[bounds[i]:bounds[i + 1]] for i, ex in enumerate(self.exercises)
+        }
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def min_date(self) -> Optional[date]:
+        return self.days[0].astype(object) if len(self) else None
+
+    @property
+    def max_date(self) -> Optional[date]:
+        return self.days[-1].astype(object) if len(self) else None
+
+    def select(
+        self, start: date, end: date, exercise: Union[None, str, Sequence[str]] = None, newest_first: bool = True
+    ) -> np.ndarray:
+        """df index labels with ``start <= date <= end`` and, if given, one of the exercise names."""
+        lo = np.searchsorted(self.days, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.days, np.datetime64(end, "D"), side="right")
+        if exercise is None:
+            pos = np.arange(lo, hi)
+        else:
+            names = [exercise] if isinstance(exercise, str) else exercise
+            own = [self.positions[n] for n in names if n in self.positions]
+            pos = [p[np.searchsorted(p, lo):np.searchsorted(p, hi)] for p in own]
+            pos = np.sort(np.concatenate(pos)) if len(pos) > 1 else (pos[0] if pos else np.arange(0))
+        labels = self.labels[pos]
+        return labels[::-1] if newest_first else labels
@@ -0,0 +1,150 @@
+# task7_records.py
+"""Personal records for the gym logger: estimated 1RM, PRs and best sets.
+
+Every set gets an estimated one-rep max (Epley or Brzycki). A set is an
+all-time PR when it beats the running best (groupby-cummax) of everything
+logged earlier for its exercise. It is a rolling PR when it beats the best
+of the previous ``ROLLING_DAYS`` (a time-based rolling max).
+
+``RecordBook`` is built once per data version. When the only change since
+the last sync is one appended entry that is newest for its exercise (the
+"Add to Log" case), the new set is scored against the running best and
+window instead of recomputing every group.
+"""
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROLLING_DAYS = 90
+MAX_BRZYCKI_REPS = 36  # the formula diverges at 37 reps
+
+
+def epley(weight, reps):
+    """w × (1 + reps / 30); a single is its own 1RM."""
+    w = np.asarray(weight, dtype=float)
+    r = np.asarray(reps, dtype=float)
+    e = np.where(r <= 1, w, w * (1 + r / 30))
+    return np.where((w > 0) & (r > 0), e, 0.0)
+
+
+def brzycki(weight, reps):
+    """w × 36 / (37 − reps), with reps capped where the formula still holds."""
+    w = np.asarray(weight, dtype=float)
+    r = np.clip(np.asarray(reps, dtype=float), 1, MAX_BRZYCKI_REPS)
+    return np.where((w > 0) & (np.asarray(reps) > 0), w * 36 / (37 - r), 0.0)
+
+
+FORMULAS: Dict[str, Callable] = {"Epley": epley, "Brzycki": brzycki}
+SET_COLUMNS = ["exercise", "date", "weight_kg", "reps", "e1rm", "pr", "rolling_pr"]
+SUMMARY_COLUMNS = ["exercise", "best_e1rm", "best_set", "best_date", "heaviest_kg", "prs", "rolling_prs", "last_pr"]
+
+
+def score_sets(df: pd.DataFrame, formula: str = "Epley", window_days: int = ROLLING_DAYS) -> pd.DataFrame:
+    """One row per set (indexed by row id), sorted by exercise and date, with e1RM and PR flags."""
+    sets = pd.DataFrame({
+        "exercise": df["exercise"].astype(str).to_numpy(),
+        "date": pd.to_datetime(df["date"]).to_numpy(),
+        "weight_kg": df["weight_kg"].to_numpy(dtype=float),
+        "reps": df["reps"].to_numpy(dtype=np.int64),
+    }, index=df.index)
+    sets = sets.sort_values(["exercise", "date"], kind="stable")
+    sets["e1rm"] = FORMULAS[formula](sets["weight_kg"], sets["reps"])
+    by_ex = sets.groupby("exercise", sort=False)
+    prior_best = sets["e1rm"].groupby(sets["exercise"], sort=False).cummax().groupby(sets["exercise"], sort=False).shift(1)
+    sets["pr"] = (sets["e1rm"] > prior_best).to_numpy()  # first set of an exercise is a baseline, not a PR
+    window = by_ex.rolling(f"{window_days}D", on="date", closed="left")["e1rm"].max()
+    sets["rolling_pr"] = (sets["e1rm"].to_numpy() > window.to_numpy()) & (sets["e1rm"].to_numpy() > 0)
+    return sets[SET_COLUMNS]
+
+
+class RecordBook:
+    """Scored sets for one formula, kept in step with the store's snapshot version."""
+
+    def __init__(self, formula: str = "Epley", window_days: int = ROLLING_DAYS):
+        self.formula = formula
+        self.window_days = window_days
+        self.version = -1
+        self.sets = score_sets(pd.DataFrame(columns=["date", "exercise", "weight_kg", "reps"]), formula)
+        self._lock = threading.Lock()
+        self._summary: Tuple[int, Optional[pd.DataFrame]] = (-1, None)
+
+    def sync(self, version: int, df: pd.DataFrame, last_append: Optional[Tuple[int, pd.DataFrame]] = None):
+        """Catch up to ``version``: score just the appended rows if that is all that changed, else rebuild."""
+        with self._lock:
+            if version == self.version:
+                return
+            if last_append is not None and last_append[0] == version == self.version + 1 and self._append(last_append[1]):
+                self.version = version
+                return
+            self.sets = score_sets(df, self.formula, self.window_days)
+            self.version = version
+
+    def _append(self, rows: pd.DataFrame) -> bool:
+        """Score rows that are newest for their exercise; False if any is backdated."""
+        sets = self.sets
+        for row_id, row in rows.iterrows():
+            ex, day = str(row["exercise"]), pd.Timestamp(row["date"])
+            own = sets[sets["exercise"].to_numpy() == ex]
+            if len(own) and day < own["date"].iloc[-1]:
+                return False
+            e1rm = float(FORMULAS[self.formula](row["weight_kg"], row["reps"]))
+            start = day - pd.Timedelta(days=self.window_days)
+            recent = own.loc[(own["date"] >= start) & (own["date"] < day), "e1rm"]
+            new = pd.DataFrame([{
+                "exercise": ex, "date": day, "weight_kg": float(row["weight_kg"]), "reps": int(row["reps"]),
+                "e1rm": e1rm,
+                "pr": bool(len(own)) and e1rm > own["e1rm"].max(),
+                "rolling_pr": e1rm > 0 and len(recent) > 0 and e1rm > recent.max(),
+            }], index=pd.Index([row_id], name=sets.index.name))
+            # newest for its exercise: it goes right after that exercise's block
+            pos = int(np.searchsorted(sets["exercise"].to_numpy(), ex, side="right"))
+            sets = pd.concat([sets.iloc[:pos], new, sets.iloc[pos:]])
+        self.sets = sets
+        return True
+
+    # ---------- reading ----------
+    def summary(self) -> pd.DataFrame:
+        """Per exercise: best e1RM and its set, heaviest weight, PR counts, last PR date."""
+        with self._lock:
+            if self._summary[0] == self.version:
+                return self._summary[1]
+            s = self.sets
+            if s.empty:
+                out = pd.DataFrame(columns=SUMMARY_COLUMNS)
+            else:
+                best = s.loc[s.groupby("exercise")["e1rm"].idxmax()]
+                g = s.groupby("exercise")
+                last_pr = s[s["pr"]].groupby("exercise")["date"].max()
+                out = pd.DataFrame({
+                    "exercise": best["exercise"].to_numpy(),
+                    "best_e1rm": best["e1rm"].round(1).to_numpy(),
+                    "best_set": [f"{w:g} kg × {r}" for w, r in zip(best["weight_kg"], best["reps"])],
+                    "best_date": best["date"].dt.date.to_numpy(),
+                    "heaviest_kg": g["weight_kg"].max().loc[best["exercise"]].to_numpy(),
+                    "prs": g["pr"].sum().loc[best["exercise"]].to_numpy(),
+                    "rolling_prs": g["rolling_pr"].sum().loc[best["exercise"]].to_numpy(),
+                    "last_pr": last_pr.reindex(best["exercise"]).dt.date.to_numpy(),
+                }).sort_values("best_e1rm", ascending=False, ignore_index=True)
+            self._summary = (self.version, out)
+            return out
+
+    def recent_prs(self, n: int = 10) -> pd.DataFrame:
+        s = self.sets
+        prs = s[s["pr"] | s["rolling_pr"]].sort_values("date", ascending=False).head(n)
+        kind = np.where(prs["pr"], "All-time", f"{self.window_days}-day")
+        return pd.DataFrame({
+            "date": prs["date"].dt.date.to_numpy(),
+            "exercise": prs["exercise"].to_numpy(),
+            "set": [f"{w:g} kg × {r}" for w, r in zip(prs["weight_kg"], prs["reps"])],
+            "e1rm": prs["e1rm"].round(1).to_numpy(),
+            "type": kind,
+        })
+
+    def trend(self, exercise: str) -> pd.DataFrame:
+        """Daily best e1RM and the running all-time best for one exercise."""
+        s = self.sets
+        own = s[s["exercise"].to_numpy() == exercise]
+        daily = own.groupby("date")["e1rm"].max()
+        return pd.DataFrame({"e1RM (day best)": daily, "all-time best": daily.cummax()})
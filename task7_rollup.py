@@ -0,0 +1,82 @@
+# task7_rollup.py
+"""Weekly volume rollup for the gym logger, keyed by (week, exercise).
+
+The rollup is a dict of running totals. Logging an entry adds to one key,
+and edits or deletes subtract the old rows and add the new ones, so the
+Weekly Progress charts read at most weeks × exercises cells instead of
+regrouping the whole history on every rerun.
+
+A rollup does no locking of its own: the store that owns it updates and
+reads it under the store lock (``WorkoutStore.weekly_volume``).
+"""
+from datetime import date
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pandas as pd
+
+Key = Tuple[date, str]
+
+
+class WeeklyRollup:
+    def __init__(self):
+        self.volume: Dict[Key, float] = {}
+        self.entries: Dict[Key, int] = {}
+        self.version = 0
+        self._frame = (-1, None)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "WeeklyRollup":
+        r = cls()
+        r.add_frame(df)
+        return r
+
+    def add_frame(self, df: pd.DataFrame, sign: int = 1):
+        """Fold many rows in with one groupby; used for edits, deletes and rebuilds."""
+        if df.empty:
+            return
+        days = pd.to_datetime(df["date"])
+        weeks = (days - pd.to_timedelta(days.dt.weekday, unit="D")).dt.date
+        grouped = df.groupby([weeks.rename("week"), df["exercise"].astype(str)])["volume"].agg(["sum", "size"])
+        for (week, ex), vol, n in zip(grouped.index, grouped["sum"].tolist(), grouped["size"].tolist()):
+            key = (week, ex)
+            left = self.entries.get(key, 0) + sign * n
+            if left <= 0:
+                self.volume.pop(key, None)
+                self.entries.pop(key, None)
+            else:
+                self.volume[key] = self.volume.get(key, 0.0) + sign * vol
+                self.entries[key] = left
+        self.version += 1
+
+    # ---------- reading ----------
+    def frame(self) -> pd.DataFrame:
+        """Long table (week, exercise, volume, entries), sorted by week; memoized per version."""
+        if self._frame[0] == self.version:
+            return self._frame[1]
+        keys = list(self.volume)
+        out = pd.DataFrame({
+            "week": pd.to_datetime([k[0] for k in keys]),
+            "exercise": [k[1] for k in keys],
+            "volume": [self.volume[k] for k in keys],
+            "entries": [self.entries[k] for k in keys],
+        })
+        out = out.sort_values(["week", "exercise"], ignore_index=True)
+        self._frame = (self.version, out)
+        return out
+
+    # ---------- persistence ----------
+    def save(self, path: Path):
+        f = self.frame()
+        tmp = Path(path).with_suffix(".tmp")
+        f.to_parquet(tmp, index=False)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "WeeklyRollup":
+        r = cls()
+        f = pd.read_parquet(path)
+        for week, ex, vol, n in zip(f["week"].dt.date, f["exercise"], f["volume"].tolist(), f["entries"].tolist()):
+            r.volume[(week, ex)] = vol
+            r.entries[(week, ex)] = int(n)
+        return r
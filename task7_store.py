@@ -0,0 +1,459 @@
+# task7_store.py
+"""Append-only workout storage for the gym logger (task7.py).
+
+Every entry has a stable integer ``id``. Changes are appended to the pending
+CSV segment as an op log instead of rewriting the whole history:
+
+- ``add`` rows are inserted entries or the new version of an edited entry;
+- ``del`` rows are deleted entries or the old version of an edited entry.
+
+Once enough ops are pending, a background thread compacts them into Parquet
+files partitioned by month (``month=YYYY-MM/part.parquet``) and rewrites
+only the months they touch. ``load`` replays the pending ops over the
+compacted partitions: for each id, the last op wins. Replaying is
+idempotent, so ``load`` stays correct while a compaction is halfway through
+and a crashed compaction is simply redone on the next open.
+
+Partitions and the rollup are Parquet, so pandas needs pyarrow (or
+fastparquet); the store refuses to open without one.
+
+The store also keeps one process-wide snapshot of the history, with
+``exercise`` as a categorical. Every session reads that same frame. Writes
+from this process replace it with a new frame and never change it in
+place, so sessions share it copy-on-write. It is re-read from disk only
+when the files' (mtime, size) signature no longer matches, e.g. after
+another process wrote.
+
+The store also owns the weekly volume rollup (task7_rollup.py). Its file
+always matches the compacted partitions. Since every op carries a full
+row, pending ops are folded in with their sign when the store opens.
+"""
+import importlib.util
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from task7_rollup import WeeklyRollup
+
+COLUMNS = ["date", "exercise", "sets", "reps", "weight_kg", "volume"]
+ROW_ID = "id"
+OP = "op"
+OP_ADD = "add"
+OP_DEL = "del"
+STORE_DIR = Path("workouts")
+LEGACY_CSV = Path("workouts.csv")
+COMPACT_ROWS = 500  # pending ops that trigger a background compaction
+ACTIVE_SEGMENT = "pending.csv"
+SEALED_GLOB = "sealed-*.csv"
+PARTITION_GLOB = "month=*/part.parquet"
+ROLLUP_FILE = "rollup.parquet"
+MANIFEST_FILE = "COMPACTING"  # names the sealed segments a compaction is folding in
+FORMAT_FILE = "FORMAT"
+FORMAT = "2"  # 1: rows without ids; 2: id-keyed partitions plus op-log segments
+
+
+def require_parquet():
+    """Raise a readable ImportError when pandas has no Parquet engine."""
+    if not any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")):
+        raise ImportError("The workout store keeps its data in Parquet files; install pyarrow (pip install pyarrow).")
+
+
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce the logger's columns and dtypes (date as datetime.date); other columns and the index are kept."""
+    df = df.copy()
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = pd.Series(dtype="object")
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["sets"] = pd.to_numeric(df["sets"], errors="coerce").fillna(0).astype(int)
+    df["reps"] = pd.to_numeric(df["reps"], errors="coerce").fillna(0).astype(int)
+    df["weight_kg"] = pd.to_numeric(df["weight_kg"], errors="coerce").fillna(0.0)
+    df["volume"] = pd.to_numeric(df["volume"], errors="coerce").fillna(0.0)
+    return df[[c for c in df.columns if c not in COLUMNS] + COLUMNS]
+
+
+def check_dates(rows: pd.DataFrame):
+    """Refuse rows without a date: they have no month partition to live in."""
+    missing = int(pd.to_datetime(rows["date"]).isna().sum())
+    if missing:
+        raise ValueError(f"{missing} entr{'y has' if missing == 1 else 'ies have'} no date; every workout needs one.")
+
+
+def empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=COLUMNS, index=pd.Index([], dtype="int64", name=ROW_ID))
+
+
+def _write_atomic(path: Path, df: pd.DataFrame):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _drop_partition(path: Path):
+    if path.exists():
+        path.unlink()
+        path.parent.rmdir()
+
+
+def _concat(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return normalize(pd.DataFrame(columns=[ROW_ID] + COLUMNS))
+    return normalize(pd.concat(parts, ignore_index=True))
+
+
+def _to_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    out = df[[ROW_ID] + COLUMNS].copy()
+    out[ROW_ID] = out[ROW_ID].astype(np.int64)
+    out["date"] = pd.to_datetime(out["date"])
+    out["exercise"] = out["exercise"].astype(str)
+    return out.reset_index(drop=True)
+
+
+def _ops(op: str, rows: pd.DataFrame) -> pd.DataFrame:
+    """Op-log rows from an id-indexed frame."""
+    out = rows[COLUMNS].copy()
+    out.insert(0, ROW_ID, rows.index.to_numpy(dtype=np.int64))
+    out.insert(0, OP, op)
+    return out
+
+
+def _replay(base: pd.DataFrame, ops: pd.DataFrame) -> pd.DataFrame:
+    """Apply ops to rows with an id column: the last op per id decides."""
+    if ops.empty:
+        return base
+    last = ops.drop_duplicates(ROW_ID, keep="last")
+    kept = base[~base[ROW_ID].isin(last[ROW_ID])]
+    return pd.concat([kept, last.loc[last[OP] == OP_ADD, [ROW_ID] + COLUMNS]], ignore_index=True)
+
+
+def _stack(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate id-indexed frames with ``exercise`` as one categorical column."""
+    frames = [f for f in frames if len(f)] or [empty_frame()]
+    exercise = union_categoricals([pd.Categorical(f["exercise"]) for f in frames], ignore_order=True)
+    out = pd.concat([f.drop(columns="exercise") for f in frames])
+    out.insert(COLUMNS.index("exercise"), "exercise", exercise)
+    return out
+
+
+def _fold(rollup: WeeklyRollup, base: pd.DataFrame, ops: pd.DataFrame):
+    """Fold what replaying ``ops`` over ``base`` changes into the rollup.
+
+    Every touched id loses its base row and gains its last add, so an entry
+    added and then edited within the same ops is counted once.
+    """
+    last = ops.drop_duplicates(ROW_ID, keep="last")
+    rollup.add_frame(base[base[ROW_ID].isin(last[ROW_ID])], -1)
+    rollup.add_frame(last[last[OP] == OP_ADD], 1)
+
+
+class WorkoutStore:
+    """Month-partitioned Parquet files plus an append-only op log under ``root``.
+
+    One instance is shared per process (task7.py caches it), so a single lock
+    orders appends, loads and compactions and hands out row ids.
+    """
+
+    def __init__(self, root: Path = STORE_DIR, compact_rows: int = COMPACT_ROWS, legacy_csv: Path = LEGACY_CSV):
+        require_parquet()
+        self.root = Path(root)
+        self.compact_rows = compact_rows
+        self._lock = threading.RLock()
+        self._compacting = threading.Lock()  # taken before _lock; one compaction or rewrite at a time
+        self._compactor: Optional[threading.Thread] = None
+        self.rollup = WeeklyRollup()
+        self.next_id = 0
+        self.version = 0  # bumped whenever the snapshot changes
+        self._snap: Optional[pd.DataFrame] = None
+        self._snap_sig: Tuple = ()
+        self.last_append: Optional[Tuple[int, pd.DataFrame]] = None  # (version, rows) when that version only appended
+        self.root.mkdir(parents=True, exist_ok=True)
+        marker = self.root / FORMAT_FILE
+        if not marker.exists() and not (self._partitions() or self._segments()):
+            # a new store, or one whose legacy import failed and left nothing behind
+            if legacy_csv is not None and Path(legacy_csv).exists():
+                self._import_legacy(Path(legacy_csv))
+        elif not marker.exists() or marker.read_text().strip() != FORMAT:
+            self._upgrade()
+        marker.write_text(FORMAT)  # only after the data it describes is in place
+        self._recover()
+
+        self.rollup = self._open_rollup()
+        ops = self._read_ops()
+        for _, base, month_ops in self._months(ops):
+            _fold(self.rollup, base, month_ops)
+        self.pending = len(ops)
+        ids = [pd.read_parquet(p, columns=[ROW_ID])[ROW_ID] for p in self._partitions()] + [ops[ROW_ID]]
+        self.next_id = int(max((s.max() for s in ids if len(s)), default=-1)) + 1
+
+    def _import_legacy(self, path: Path):
+        """Build the store from the old single CSV; on failure remove what was written so the next open retries."""
+        try:
+            self.rewrite(normalize(pd.read_csv(path)).reset_index(drop=True))
+        except Exception as e:
+            for part in self._partitions():
+                _drop_partition(part)
+            (self.root / ROLLUP_FILE).unlink(missing_ok=True)
+            if isinstance(e, ValueError):
+                raise ValueError(f"Could not import {path}: {e}") from e
+            raise
+
+    def _upgrade(self):
+        """Give rows written before row ids (format 1) an id and rewrite them once."""
+        rows = _concat([pd.read_parquet(p) for p in self._partitions()] + [pd.read_csv(p) for p in self._segments()])
+        self.rewrite(rows[COLUMNS].reset_index(drop=True))
+
+    def _recover(self):
+        """Finish a compaction that stopped after writing its manifest.
+
+        The partitions may hold some, all or none of the listed segments' ops
+        and the saved rollup may or may not count them, so the merge is redone
+        and the rollup rebuilt from the partitions before the segments go.
+        """
+        manifest = self.root / MANIFEST_FILE
+        if not manifest.exists():
+            return
+        sealed = [p for p in (self.root / name for name in manifest.read_text().split()) if p.exists()]
+        emptied = self._merge(self._read_ops(sealed))
+        for path in emptied:
+            _drop_partition(path)
+        WeeklyRollup.from_frame(self._read_partitions()).save(self.root / ROLLUP_FILE)
+        self._finish(sealed)
+
+    def _open_rollup(self) -> WeeklyRollup:
+        """Saved rollup if it is newer than every partition, else rebuilt from them."""
+        path = self.root / ROLLUP_FILE
+        parts = self._partitions()
+        newest = max((p.stat().st_mtime_ns for p in parts), default=0)
+        if path.exists() and path.stat().st_mtime_ns >= newest:
+            return WeeklyRollup.load(path)
+        rollup = WeeklyRollup.from_frame(self._read_partitions())
+        rollup.save(path)
+        return rollup
+
+    # ---------- reading ----------
+    def _segments(self) -> List[Path]:
+        sealed = sorted(self.root.glob(SEALED_GLOB))
+        active = self.root / ACTIVE_SEGMENT
+        return sealed + ([active] if active.exists() else [])
+
+    def _partitions(self) -> List[Path]:
+        return sorted(self.root.glob(PARTITION_GLOB))
+
+    def _read_partitions(self) -> pd.DataFrame:
+        return _concat([pd.read_parquet(p) for p in self._partitions()])
+
+    def _read_ops(self, paths: Optional[List[Path]] = None) -> pd.DataFrame:
+        ops = _concat([pd.read_csv(p) for p in (self._segments() if paths is None else paths)])
+        if OP not in ops.columns:
+            ops.insert(0, OP, pd.Series(dtype="object"))
+        return ops
+
+    def load(self) -> pd.DataFrame:
+        """The current history read from disk, indexed by row id."""
+        with self._lock:
+            rows = _replay(self._read_partitions(), self._read_ops())
+        rows = normalize(rows)
+        rows.index = pd.Index(rows.pop(ROW_ID).astype(np.int64), name=ROW_ID)
+        return _stack([rows])
+
+    def signature(self) -> Tuple:
+        """(path, mtime, size) of every data file; changes whenever any file is written."""
+        with self._lock:
+            files = self._partitions() + self._segments()
+            return tuple((str(p), st.st_mtime_ns, st.st_size) for p, st in ((p, p.stat()) for p in files))
+
+    def snapshot(self) -> Tuple[int, pd.DataFrame]:
+        """(version, shared read-only history); re-read only if the files changed underneath."""
+        with self._lock:
+            sig = self.signature()
+            if self._snap is None or sig != self._snap_sig:
+                self._set_snapshot(self.load())
+            return self.version, self._snap
+
+    def weekly_volume(self) -> pd.DataFrame:
+        """The rollup's (week, exercise) table, read under the lock that orders its updates."""
+        with self._lock:
+            return self.rollup.frame()
+
+    def _set_snapshot(self, frame: Optional[pd.DataFrame]):
+        self._snap = frame
+        self._snap_sig = self.signature()
+        self.version += 1
+
+    def _in_sync(self) -> bool:
+        return self._snap is not None and self._snap_sig == self.signature()
+
+    # ---------- writing ----------
+    def _log(self, ops: pd.DataFrame):
+        """Append ops to the active segment; O(ops), independent of history size."""
+        ops = ops.copy()
+        ops["date"] = pd.to_datetime(ops["date"]).dt.strftime("%Y-%m-%d")
+        with self._lock:
+            active = self.root / ACTIVE_SEGMENT
+            new = not active.exists()
+            with open(active, "a", newline="", encoding="utf-8") as f:
+                ops.to_csv(f, header=new, index=False)
+            self.pending += len(ops)
+            # one write's ops: each del row is the version the rollup counts now
+            self.rollup.add_frame(ops[ops[OP] == OP_DEL], -1)
+            self.rollup.add_frame(ops[ops[OP] == OP_ADD], 1)
+            due = self.pending >= self.compact_rows
+        if due:
+            self.compact_async()
+
+    def _take_ids(self, n: int) -> np.ndarray:
+        with self._lock:
+            ids = np.arange(self.next_id, self.next_id + n, dtype=np.int64)
+            self.next_id += n
+        return ids
+
+    def append(self, rows: Sequence[Dict]) -> List[int]:
+        """Log new entries and return the ids given to them."""
+        batch = pd.DataFrame(list(rows), columns=COLUMNS)
+        check_dates(batch)
+        with self._lock:
+            batch.index = pd.Index(self._take_ids(len(batch)), name=ROW_ID)
+            in_sync = self._in_sync()
+            self._log(_ops(OP_ADD, batch))
+            self._set_snapshot(_stack([self._snap, batch]) if in_sync else None)
+            self.last_append = (self.version, batch) if in_sync else None
+        return batch.index.tolist()
+
+    def apply(self, diff):
+        """Log only what a ``task7_diff.EditDiff`` changed. Inserted rows get their ids here.
+
+        The old versions are taken from the current snapshot, not from the
+        slice the session edited, which may be stale. Updates and deletes of
+        rows another session already deleted are dropped.
+        """
+        check_dates(pd.concat([diff.after[COLUMNS], diff.inserts[COLUMNS]]))
+        with self._lock:
+            _, current = self.snapshot()
+            diff.after = diff.after.loc[diff.after.index.isin(current.index)]
+            diff.before = current.loc[diff.after.index, COLUMNS]
+            diff.deleted = current.loc[current.index.intersection(diff.deleted.index), COLUMNS]
+            diff.inserts.index = pd.Index(self._take_ids(len(diff.inserts)), name=ROW_ID)
+            ops = pd.concat([
+                _ops(OP_DEL, diff.deleted),
+                _ops(OP_DEL, diff.before),   # old versions before new ones: last op per id wins
+                _ops(OP_ADD, diff.after),
+                _ops(OP_ADD, diff.inserts),
+            ], ignore_index=True)
+            if ops.empty:
+                return
+            in_sync = self._in_sync()
+            self._log(ops)
+            if in_sync:
+                kept = self._snap.drop(index=diff.removed_ids())
+                self._set_snapshot(_stack([kept, diff.after, diff.inserts]))
+            else:
+                self._set_snapshot(None)
+
+    def rewrite(self, df: pd.DataFrame):
+        """Replace the whole history with ``df`` (indexed by row id); used for Clear All and migrations."""
+        check_dates(df)
+        rows = df.rename_axis(ROW_ID).reset_index()
+        cols = _to_columnar(rows)
+        months = cols["date"].dt.strftime("%Y-%m")
+        with self._compacting, self._lock:
+            keep = set()
+            for month, part in cols.groupby(months, sort=False):
+                path = self.root / f"month={month}" / "part.parquet"
+                _write_atomic(path, part.reset_index(drop=True))
+                keep.add(path)
+            for path in self._partitions():
+                if path not in keep:
+                    _drop_partition(path)
+            self._finish(self._segments())
+            self.pending = 0
+            self.next_id = max(self.next_id, int(cols[ROW_ID].max()) + 1 if len(cols) else 0)
+            self.rollup = WeeklyRollup.from_frame(cols)
+            self.rollup.save(self.root / ROLLUP_FILE)
+            snap = normalize(rows[[ROW_ID] + COLUMNS]).set_index(ROW_ID)
+            snap.index = snap.index.astype(np.int64)
+            self._set_snapshot(_stack([snap]))
+
+    # ---------- compaction ----------
+    def compact_async(self):
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="task7-compaction", daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        """Replay sealed ops into the month partitions they touch.
+
+        The lock is held only to seal the active segment and, at the end, to
+        drop what was consumed; the Parquet IO runs while appends and loads go
+        on. The manifest is written before any partition, so a crash from
+        there on is finished by ``_recover`` on the next open.
+        """
+        with self._compacting:
+            with self._lock:
+                snap = self._snap if self._in_sync() else None
+                active = self.root / ACTIVE_SEGMENT
+                if active.exists():
+                    active.rename(self.root / f"sealed-{time.time_ns()}.csv")
+                sealed = sorted(self.root.glob(SEALED_GLOB))
+            if not sealed:
+                return
+            manifest = self.root / MANIFEST_FILE
+            tmp = manifest.with_suffix(".tmp")
+            tmp.write_text("\n".join(p.name for p in sealed))
+            os.replace(tmp, manifest)
+
+            ops = self._read_ops(sealed)
+            rollup = self._open_rollup()  # still matches the partitions as they were before this merge
+            emptied = self._merge(ops, rollup)
+            rollup.save(self.root / ROLLUP_FILE)
+
+            with self._lock:
+                for path in emptied:  # removed under the lock so a load never lists a vanishing file
+                    _drop_partition(path)
+                self._finish(sealed)
+                self.pending = max(0, self.pending - len(ops))
+                if snap is not None and self._snap is snap:  # same rows, new files: keep the snapshot, re-sign it
+                    self._snap_sig = self.signature()
+
+    def _months(self, ops: pd.DataFrame):
+        """(partition path, its rows, the ops dated in that month) for every month the ops touch.
+
+        An edit that moves a row to another month logs its old version as a
+        ``del`` dated in the old month, so per-month replay sees every base row it changes.
+        """
+        months = pd.to_datetime(ops["date"]).dt.strftime("%Y-%m")
+        for month, month_ops in ops.groupby(months, sort=False):
+            path = self.root / f"month={month}" / "part.parquet"
+            yield path, _concat([pd.read_parquet(path)]) if path.exists() else _concat([]), month_ops
+
+    def _merge(self, ops: pd.DataFrame, rollup: Optional[WeeklyRollup] = None) -> List[Path]:
+        """Write the touched month partitions, folding the changes into ``rollup`` if given.
+
+        Returns the partitions left empty (still on disk).
+        """
+        emptied = []
+        for path, base, month_ops in self._months(ops):
+            if rollup is not None:
+                _fold(rollup, base, month_ops)
+            rows = _replay(base, month_ops)
+            if rows.empty:
+                emptied.append(path)
+            else:
+                _write_atomic(path, _to_columnar(rows))
+        return emptied
+
+    def _finish(self, sealed: List[Path]):
+        """Delete consumed segments, then the manifest that named them."""
+        for seg in sealed:
+            if seg.exists():
+                seg.unlink()
+        (self.root / MANIFEST_FILE).unlink(missing_ok=True)